@@ -1,6 +1,7 @@
 """
 FastAPI dependencies for authentication and authorization
 """
+from functools import lru_cache
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -9,16 +10,33 @@ from uuid import UUID
 from app.database import get_db
 from app.models.user import User
 from app.core.security import decode_access_token
+from app.services.salesforce_service import SalesforceService
 
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+@lru_cache(maxsize=1)
+def _salesforce_service() -> SalesforceService:
+    return SalesforceService()
+
+
+async def get_salesforce_service() -> SalesforceService:
     """
-    Dependency to get the current authenticated user from JWT token.
+    Dependency returning the process-wide SalesforceService.
+    
+    A single instance keeps its caches (and, in production, its HTTP
+    connection pool) shared across all routes and requests.
+    """
+    return _salesforce_service()
+
+
+async def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> UUID:
+    """
+    Dependency to get the current user's ID from the JWT token alone.
+    
+    Skips the database lookup, for routes that only need the ID.
     """
     token = credentials.credentials
     payload = decode_access_token(token)
@@ -39,14 +57,22 @@ async def get_current_user(
         )
     
     try:
-        user_id = UUID(user_id_str)
+        return UUID(user_id_str)
     except (ValueError, TypeError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user ID in token",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    
+
+
+async def get_current_user(
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """
+    Dependency to get the current authenticated user from JWT token.
+    """
     result = await db.execute(select(User).where(User.user_id == user_id))
     user = result.scalar_one_or_none()
     
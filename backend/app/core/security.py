@@ -1,11 +1,17 @@
 """
 Security utilities for password hashing and JWT tokens
 """
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 from typing import Optional
 from jose import JWTError, jwt
+import asyncio
+import base64
 import bcrypt
+import hashlib
 import secrets
+import threading
+import time
 import os
 
 # JWT settings
@@ -13,9 +19,65 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Password hashing settings
+# The cost is stored inside each hash, so changing it only affects new hashes
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Draw salts from a batched os.urandom read instead of one syscall per hash
+# (useful for bulk registration/import)
+BCRYPT_SALT_POOL = os.getenv("BCRYPT_SALT_POOL") == "1"
+
+# Verified token cache settings
+TOKEN_CACHE_MAXSIZE = 10_000
+TOKEN_CACHE_TTL_SECONDS = 60
+
 # Password reset token settings
 RESET_TOKEN_EXPIRE_HOURS = 24
 
+# Hash compared against when a login email doesn't exist (see get_dummy_password_hash)
+_dummy_password_hash: Optional[str] = None
+
+# Raw token -> (cache expiry as epoch seconds, verified payload)
+_token_cache: dict[str, tuple[float, dict]] = {}
+_token_cache_lock = threading.Lock()
+
+# Standard base64 alphabet -> bcrypt's "./A-Za-z0-9" alphabet
+_BCRYPT_B64 = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/",
+    b"./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789",
+)
+
+
+class _SaltPool:
+    """Hands out bcrypt salts sliced from one batched os.urandom read"""
+    
+    SALT_BYTES = 16
+    
+    def __init__(self, batch_size: int = 256):
+        self._batch_size = batch_size
+        self._buffer = b""
+        self._offset = 0
+        self._lock = threading.Lock()
+    
+    def gensalt(self, rounds: int) -> bytes:
+        """Return a salt in the same "$2b$<rounds>$<22 chars>" format as bcrypt.gensalt"""
+        with self._lock:
+            if self._offset >= len(self._buffer):
+                self._buffer = os.urandom(self.SALT_BYTES * self._batch_size)
+                self._offset = 0
+            raw = self._buffer[self._offset:self._offset + self.SALT_BYTES]
+            self._offset += self.SALT_BYTES
+        return b"$2b$%02d$" % rounds + base64.b64encode(raw).translate(_BCRYPT_B64)[:22]
+
+
+_salt_pool = _SaltPool()
+
+# bcrypt releases the GIL while hashing, so a pool sized to the CPU count
+# runs password checks in parallel without starving the default executor
+_password_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1,
+    thread_name_prefix="bcrypt",
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -40,35 +102,133 @@ def get_password_hash(password: str) -> str:
         raise ValueError("Password cannot be longer than 72 bytes")
     
     # Generate salt and hash password
-    salt = bcrypt.gensalt(rounds=12)
+    if BCRYPT_SALT_POOL:
+        salt = _salt_pool.gensalt(BCRYPT_ROUNDS)
+    else:
+        salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password_bytes, salt)
     
     # Return as string for database storage
     return hashed.decode('utf-8')
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the bcrypt executor without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the bcrypt executor without blocking the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, get_password_hash, password)
+
+
+async def init_dummy_password_hash() -> None:
+    """Hash a random password on the bcrypt executor; run once at startup"""
+    global _dummy_password_hash
+    if _dummy_password_hash is None:
+        _dummy_password_hash = await get_password_hash_async(secrets.token_urlsafe(16))
+
+
+async def get_dummy_password_hash() -> str:
+    """
+    Hash of a random password, precomputed by init_dummy_password_hash.
+    
+    Verifying against it when a user doesn't exist costs the same as a real
+    check, so unknown emails can't be detected by faster responses. If
+    startup didn't run (e.g. an app driven without lifespan events), it is
+    computed here instead, still off the event loop.
+    """
+    if _dummy_password_hash is None:
+        await init_dummy_password_hash()
+    return _dummy_password_hash
+
+
+def measure_password_hash_ms() -> float:
+    """
+    Time a single password hash at the configured BCRYPT_ROUNDS.
+    
+    Used to calibrate the cost factor against a target latency budget.
+    """
+    start = time.perf_counter()
+    get_password_hash(secrets.token_urlsafe(16))
+    return (time.perf_counter() - start) * 1000
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expires_in = expires_delta.total_seconds()
     else:
-        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        expires_in = ACCESS_TOKEN_EXPIRE_MINUTES * 60
     
-    to_encode.update({"exp": expire})
+    # Integer epoch "exp" skips datetime conversion on encode
+    to_encode.update({"exp": int(time.time() + expires_in)})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token"""
+    """
+    Decode and verify a JWT token.
+    
+    Verified payloads are cached by the raw token for up to
+    TOKEN_CACHE_TTL_SECONDS (never past the token's own "exp"), so a bearer
+    token replayed on every request is only verified once per window.
+    Invalid tokens are never cached.
+    """
+    now = time.time()
+    with _token_cache_lock:
+        cached = _token_cache.get(token)
+    if cached is not None:
+        cache_expires, payload = cached
+        if cache_expires > now:
+            return payload
+        invalidate_access_token(token)
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         return None
+    
+    cache_expires = now + TOKEN_CACHE_TTL_SECONDS
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        cache_expires = min(cache_expires, exp)
+    
+    with _token_cache_lock:
+        if len(_token_cache) >= TOKEN_CACHE_MAXSIZE:
+            # Evict the oldest entry (dicts preserve insertion order)
+            _token_cache.pop(next(iter(_token_cache)), None)
+        _token_cache[token] = (cache_expires, payload)
+    return payload
+
+
+def invalidate_access_token(token: str) -> None:
+    """Evict a token from the verified token cache (logout/password change)"""
+    with _token_cache_lock:
+        _token_cache.pop(token, None)
+
+
+def invalidate_user_tokens(user_id) -> None:
+    """Evict every cached token of a user (password reset)"""
+    sub = str(user_id)
+    with _token_cache_lock:
+        for token in [t for t, (_, payload) in _token_cache.items() if payload.get("sub") == sub]:
+            del _token_cache[token]
 
 
 def generate_reset_token() -> str:
     """Generate a secure random token for password reset"""
     return secrets.token_urlsafe(32)
+
+
+def hash_reset_token(token: str) -> str:
+    """
+    Hash a password reset token for storage and lookup.
+    
+    Only the hash is stored, so a database dump can't be used to reset passwords.
+    """
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
@@ -8,6 +8,8 @@ and complex Salesforce API interactions.
 
 # Load environment variables from .env file FIRST, before any other imports
 from dotenv import load_dotenv
+import asyncio
+import logging
 import os
 
 # Load .env file from the backend directory
@@ -16,8 +18,11 @@ load_dotenv(dotenv_path=env_path)
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import documents, cases, auth
+from app.routes import documents, cases, customer, auth
 from app.database import engine, Base
+from app.core.security import BCRYPT_ROUNDS, init_dummy_password_hash, measure_password_hash_ms
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="Customer Portal API",
@@ -27,10 +32,15 @@ app = FastAPI(
 
 # CORS configuration for frontend access
 # In production, restrict origins to specific domains
-ALLOWED_ORIGINS = os.getenv(
-    "ALLOWED_ORIGINS",
-    "http://localhost:5173,http://localhost:3000,https://panel.powerme.space"
-).split(",")
+# Whitespace around entries (common in .env files) is ignored
+ALLOWED_ORIGINS = tuple(
+    origin.strip()
+    for origin in os.getenv(
+        "ALLOWED_ORIGINS",
+        "http://localhost:5173,http://localhost:3000,https://panel.powerme.space"
+    ).split(",")
+    if origin.strip()
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -44,6 +54,7 @@ app.add_middleware(
 app.include_router(auth.router)
 app.include_router(documents.router)
 app.include_router(cases.router)
+app.include_router(customer.router)
 
 
 @app.get("/")
@@ -64,6 +75,21 @@ async def health():
 
 @app.on_event("startup")
 async def startup_event():
-    """Initialize database tables on startup"""
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    """
+    Optional startup tasks.
+    
+    Schema creation belongs to deployment (run `python init_db.py` once),
+    so workers don't all race on the same DDL at boot. Set
+    AUTO_CREATE_SCHEMA=1 to create tables on startup in development.
+    """
+    if os.getenv("AUTO_CREATE_SCHEMA") == "1":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    
+    # Precompute the unknown-email login hash off the event loop, so the
+    # first such login neither blocks other requests nor takes twice as long
+    await init_dummy_password_hash()
+    
+    if os.getenv("BCRYPT_CALIBRATE") == "1":
+        hash_ms = await asyncio.to_thread(measure_password_hash_ms)
+        logger.info("bcrypt cost %d: %.1f ms per hash", BCRYPT_ROUNDS, hash_ms)
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from pydantic import BaseModel, Field, StringConstraints
+from typing import Annotated, Optional
 from datetime import datetime
 
 
@@ -20,16 +20,11 @@ class CaseCreateRequest(BaseModel):
     - subject: Required. Brief description of the issue/request
     - description: Optional. Detailed description
     """
-    subject: str = Field(..., min_length=1, description="Subject of the case (required)")
+    # Stripped and checked for emptiness in pydantic-core, no Python validator
+    subject: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)] = Field(
+        ..., description="Subject of the case (required)"
+    )
     description: Optional[str] = Field(None, description="Detailed description (optional)")
-    
-    @field_validator('subject')
-    @classmethod
-    def validate_subject(cls, v: str) -> str:
-        """Validate that subject is not empty or only whitespace"""
-        if not v or not v.strip():
-            raise ValueError('Subject is required and cannot be empty')
-        return v.strip()
 
 
 class CaseListResponse(BaseModel):
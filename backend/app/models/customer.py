@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from app.models.case import Case
+from app.models.document import Document
+
+
+class CustomerBundleResponse(BaseModel):
+    documents: list[Document]
+    cases: list[Case]
@@ -1,7 +1,7 @@
 """
 User database model
 """
-from sqlalchemy import Column, String, DateTime, Text
+from sqlalchemy import Column, String, DateTime, Index
 from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 import uuid
@@ -13,13 +13,17 @@ class User(Base):
 
     user_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     email = Column(String(255), unique=True, nullable=False, index=True)
-    password = Column(String(255), nullable=False)  # Hashed password
+    password = Column(String(60), nullable=False)  # bcrypt hash (always 60 chars)
     role = Column(String(50), nullable=False, default="user")  # e.g., "user", "admin", "customer"
-    token = Column(Text, nullable=True)  # JWT token or refresh token
-    reset_password_token = Column(String(255), nullable=True)  # Token for password reset
+    reset_password_token_hash = Column(String(64), nullable=True)  # SHA-256 hex of the password reset token
     reset_password_expires = Column(DateTime, nullable=True)  # Expiration for reset token
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # reset_password filters on both columns
+        Index("ix_users_reset_password_token_hash_expires", "reset_password_token_hash", "reset_password_expires"),
+    )
+
     def __repr__(self):
         return f"<User(user_id={self.user_id}, email={self.email}, role={self.role})>"
@@ -1,11 +1,13 @@
 """
 Authentication routes: register, login, password reset
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.orm import load_only
 from datetime import datetime, timedelta
-from app.database import get_db
+from app.database import AsyncSessionLocal, get_db
 from app.models.user import User
 from app.schemas.user import (
     UserCreate,
@@ -17,14 +19,18 @@ from app.schemas.user import (
     PasswordChange,
 )
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_password_async,
+    get_password_hash_async,
+    get_dummy_password_hash,
     create_access_token,
     decode_access_token,
+    invalidate_access_token,
+    invalidate_user_tokens,
     generate_reset_token,
+    hash_reset_token,
     RESET_TOKEN_EXPIRE_HOURS,
 )
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user, security
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 
@@ -41,7 +47,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     Returns an access token for immediate authentication.
     """
     # Check if user already exists
-    result = await db.execute(select(User).where(User.email == user_data.email))
+    result = await db.execute(select(User.user_id).where(User.email == user_data.email).limit(1))
     existing_user = result.scalar_one_or_none()
     
     if existing_user:
@@ -59,8 +65,9 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
         )
     
     # Create new user with customer role by default
+    # bcrypt is CPU-bound, so hash on the bcrypt executor to keep the event loop free
     try:
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -75,25 +82,16 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     )
     
     db.add(new_user)
+    # user_id and timestamps are Python-side defaults filled in on flush, and
+    # the session doesn't expire on commit, so no refresh SELECT is needed
     await db.commit()
-    await db.refresh(new_user)
     
     # Create access token for automatic login
     access_token = create_access_token(data={"sub": str(new_user.user_id), "email": new_user.email, "role": new_user.role})
     
-    # Store token in user record (optional - for refresh token storage)
-    new_user.token = access_token
-    await db.commit()
-    
     return TokenResponse(
         access_token=access_token,
-        user=UserResponse(
-            user_id=new_user.user_id,
-            email=new_user.email,
-            role=new_user.role,
-            created_at=new_user.created_at,
-            updated_at=new_user.updated_at,
-        )
+        user=UserResponse.model_validate(new_user)
     )
 
 
@@ -105,11 +103,22 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     - **email**: User email
     - **password**: User password
     """
-    # Find user by email
-    result = await db.execute(select(User).where(User.email == credentials.email))
+    # Find user by email, loading only the columns needed for the response
+    result = await db.execute(
+        select(User)
+        .options(load_only(
+            User.user_id, User.email, User.password, User.role, User.created_at, User.updated_at
+        ))
+        .where(User.email == credentials.email)
+        .limit(1)
+    )
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(credentials.password, user.password):
+    # Always run one bcrypt check so unknown emails take as long as wrong passwords
+    hashed_password = user.password if user else await get_dummy_password_hash()
+    password_valid = await verify_password_async(credentials.password, hashed_password)
+    
+    if not user or not password_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -118,48 +127,52 @@ async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     # Create access token
     access_token = create_access_token(data={"sub": str(user.user_id), "email": user.email, "role": user.role})
     
-    # Update user token (optional - for refresh token storage)
-    user.token = access_token
-    await db.commit()
-    
     return TokenResponse(
         access_token=access_token,
-        user=UserResponse(
-            user_id=user.user_id,
-            email=user.email,
-            role=user.role,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
-        )
+        user=UserResponse.model_validate(user)
     )
 
 
+async def _persist_reset_token(email: str, reset_token: str) -> None:
+    """
+    Store a reset token on the user with the given email, if any.
+    
+    Runs as a background task after the request's session is closed, so it
+    opens its own.
+    """
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(User)
+            .where(User.email == email)
+            .values(
+                reset_password_token_hash=hash_reset_token(reset_token),
+                reset_password_expires=datetime.utcnow() + timedelta(hours=RESET_TOKEN_EXPIRE_HOURS),
+            )
+        )
+        await db.commit()
+    
+    # In production, send email with reset token here
+
+
 @router.post("/forgot-password", status_code=status.HTTP_200_OK)
-async def forgot_password(request: PasswordResetRequest, db: AsyncSession = Depends(get_db)):
+async def forgot_password(
+    request: PasswordResetRequest,
+    background_tasks: BackgroundTasks,
+):
     """
     Request password reset. Generates a reset token.
     
     - **email**: User email address
-    """
-    # Find user by email
-    result = await db.execute(select(User).where(User.email == request.email))
-    user = result.scalar_one_or_none()
     
-    if not user:
-        # Don't reveal if email exists for security
-        return {"message": "If the email exists, a password reset link has been sent"}
-    
-    # Generate reset token
+    The token is stored after the response is sent, so the response and its
+    timing are the same whether or not the email exists.
+    """
     reset_token = generate_reset_token()
-    user.reset_password_token = reset_token
-    user.reset_password_expires = datetime.utcnow() + timedelta(hours=RESET_TOKEN_EXPIRE_HOURS)
-    
-    await db.commit()
+    background_tasks.add_task(_persist_reset_token, request.email, reset_token)
     
-    # In production, send email with reset token here
-    # For now, we'll return it (remove this in production!)
+    # For now, we'll return the token (remove this in production!)
     return {
-        "message": "Password reset token generated",
+        "message": "If the email exists, a password reset link has been sent",
         "reset_token": reset_token,  # Remove this in production - send via email instead
         "expires_in_hours": RESET_TOKEN_EXPIRE_HOURS
     }
@@ -176,7 +189,7 @@ async def reset_password(reset_data: PasswordReset, db: AsyncSession = Depends(g
     # Find user by reset token
     result = await db.execute(
         select(User).where(
-            User.reset_password_token == reset_data.token,
+            User.reset_password_token_hash == hash_reset_token(reset_data.token),
             User.reset_password_expires > datetime.utcnow()
         )
     )
@@ -189,10 +202,10 @@ async def reset_password(reset_data: PasswordReset, db: AsyncSession = Depends(g
         )
     
     # Update password
-    user.password = get_password_hash(reset_data.new_password)
-    user.reset_password_token = None
+    user.password = await get_password_hash_async(reset_data.new_password)
+    user.reset_password_token_hash = None
     user.reset_password_expires = None
-    user.token = None  # Invalidate existing tokens
+    invalidate_user_tokens(user.user_id)
     
     await db.commit()
     
@@ -203,6 +216,7 @@ async def reset_password(reset_data: PasswordReset, db: AsyncSession = Depends(g
 async def change_password(
     password_data: PasswordChange,
     current_user: User = Depends(get_current_user),
+    credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -214,15 +228,15 @@ async def change_password(
     Requires authentication. Add JWT token in Authorization header.
     """
     # Verify current password
-    if not verify_password(password_data.current_password, current_user.password):
+    if not await verify_password_async(password_data.current_password, current_user.password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
         )
     
     # Update password
-    current_user.password = get_password_hash(password_data.new_password)
-    current_user.token = None  # Invalidate existing tokens
+    current_user.password = await get_password_hash_async(password_data.new_password)
+    invalidate_access_token(credentials.credentials)
     
     await db.commit()
     
@@ -238,10 +252,4 @@ async def get_current_user_info(
     
     Requires authentication. Add JWT token in Authorization header.
     """
-    return UserResponse(
-        user_id=current_user.user_id,
-        email=current_user.email,
-        role=current_user.role,
-        created_at=current_user.created_at,
-        updated_at=current_user.updated_at,
-    )
+    return UserResponse.model_validate(current_user)
@@ -1,17 +1,17 @@
 from fastapi import APIRouter, HTTPException, status, Depends
+from uuid import UUID
 from app.models.case import CaseListResponse, CaseCreateRequest, CaseCreateResponse
-from app.models.user import User
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user_id, get_salesforce_service
 from app.services.salesforce_service import SalesforceService
 
 router = APIRouter(prefix="/customer", tags=["cases"])
-salesforce_service = SalesforceService()
 
 
 @router.get("/{customer_id}/cases", response_model=CaseListResponse)
 async def get_customer_cases(
     customer_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user_id: UUID = Depends(get_current_user_id),
+    salesforce_service: SalesforceService = Depends(get_salesforce_service)
 ):
     """
     Retrieve all cases/tickets for a customer.
@@ -20,14 +20,14 @@ async def get_customer_cases(
     Requires authentication. Users can only access their own cases.
     """
     # Ensure user can only access their own data
-    if str(current_user.user_id) != customer_id:
+    if str(current_user_id) != customer_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only access your own cases"
         )
     
     try:
-        cases = salesforce_service.get_customer_cases(customer_id)
+        cases = await salesforce_service.get_customer_cases(customer_id)
         return CaseListResponse(cases=cases)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving cases: {str(e)}")
@@ -37,7 +37,8 @@ async def get_customer_cases(
 async def create_customer_case(
     customer_id: str,
     case_request: CaseCreateRequest,
-    current_user: User = Depends(get_current_user)
+    current_user_id: UUID = Depends(get_current_user_id),
+    salesforce_service: SalesforceService = Depends(get_salesforce_service)
 ):
     """
     Create a new case/ticket for a customer.
@@ -49,23 +50,17 @@ async def create_customer_case(
     - **description**: Optional. Detailed description
     """
     # Ensure user can only create cases for themselves
-    if str(current_user.user_id) != customer_id:
+    if str(current_user_id) != customer_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only create cases for yourself"
         )
     
-    # Validation is handled by Pydantic model
+    # Validation (including blank subjects) is handled by the Pydantic model
     # Additional business logic validation could go here
     
-    if not case_request.subject or not case_request.subject.strip():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Subject is required and cannot be empty"
-        )
-    
     try:
-        created_case = salesforce_service.create_case(customer_id, case_request)
+        created_case = await salesforce_service.create_case(customer_id, case_request)
         
         return CaseCreateResponse(
             case_id=created_case.case_id,
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, HTTPException, status, Depends
+from uuid import UUID
+from app.models.customer import CustomerBundleResponse
+from app.core.dependencies import get_current_user_id, get_salesforce_service
+from app.services.salesforce_service import SalesforceService
+
+router = APIRouter(prefix="/customer", tags=["customer"])
+
+
+@router.get("/{customer_id}/bundle", response_model=CustomerBundleResponse)
+async def get_customer_bundle(
+    customer_id: str,
+    current_user_id: UUID = Depends(get_current_user_id),
+    salesforce_service: SalesforceService = Depends(get_salesforce_service)
+):
+    """
+    Retrieve all documents and cases for a customer in one request.
+    
+    Intended for the dashboard, which needs both lists on load.
+    Requires authentication. Users can only access their own data.
+    """
+    # Ensure user can only access their own data
+    if str(current_user_id) != customer_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You can only access your own data"
+        )
+    
+    try:
+        documents, cases = await salesforce_service.get_customer_bundle(customer_id)
+        return CustomerBundleResponse(documents=documents, cases=cases)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error retrieving customer data: {str(e)}")
@@ -1,17 +1,27 @@
 from fastapi import APIRouter, HTTPException, Depends, status, UploadFile, File, Form
-from fastapi.responses import FileResponse
-from pathlib import Path
+from fastapi.responses import FileResponse, StreamingResponse
+from typing import AsyncIterator
+from uuid import UUID
 from app.models.document import DocumentListResponse, Document
-from app.models.user import User
-from app.core.dependencies import get_current_user
+from app.core.dependencies import get_current_user_id, get_salesforce_service
 from app.services.salesforce_service import SalesforceService
 
 router = APIRouter(prefix="/customer", tags=["documents"])
-salesforce_service = SalesforceService()
 
-# Path to documents directory in mocks/salesforce
-DOCUMENTS_DIR = Path(__file__).parent.parent.parent / "mocks" / "salesforce"
-DOCUMENTS_DIR.mkdir(parents=True, exist_ok=True)
+# Maximum upload size
+MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+
+# Document lists longer than this are streamed row by row
+STREAM_THRESHOLD = 500
+
+
+async def _stream_documents(documents: list[Document]) -> AsyncIterator[bytes]:
+    """Serialize a DocumentListResponse body one document at a time"""
+    yield b'{"documents":['
+    for i, document in enumerate(documents):
+        row = document.__pydantic_serializer__.to_json(document)
+        yield b',' + row if i else row
+    yield b']}'
 
 
 # IMPORTANT: More specific routes must be defined BEFORE more general ones
@@ -19,7 +29,8 @@ DOCUMENTS_DIR.mkdir(parents=True, exist_ok=True)
 @router.get("/documents/{document_id}/download")
 async def download_document(
     document_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user_id: UUID = Depends(get_current_user_id),
+    salesforce_service: SalesforceService = Depends(get_salesforce_service)
 ):
     """
     Download a document by document ID.
@@ -27,36 +38,27 @@ async def download_document(
     Requires authentication. Users can only download their own documents.
     """
     try:
-        # Get customer documents to verify ownership
-        documents = salesforce_service.get_customer_documents(str(current_user.user_id))
+        # Single index lookup instead of mapping the customer's whole document list
+        document = await salesforce_service.lookup_document(document_id)
         
-        # Find the document
-        document = next((doc for doc in documents if doc.document_id == document_id), None)
-        
-        if not document:
+        # Another customer's document gets the same 404 as a missing one,
+        # so document IDs can't be probed for existence
+        if not document or document.customer_id != str(current_user_id):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Document not found"
             )
         
-        # Verify user owns this document
-        if document.customer_id != str(current_user.user_id):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="You can only download your own documents"
-            )
-        
-        # Construct PDF filename from document_id
-        pdf_filename = f"{document_id}.pdf"
-        pdf_path = DOCUMENTS_DIR / pdf_filename
-        
-        if not pdf_path.exists():
+        # The PDF's location comes from the in-memory index; FileResponse
+        # does the only stat, off the event loop
+        pdf_path = await salesforce_service.get_pdf_path(document_id)
+        if pdf_path is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="PDF file not found"
             )
         
-        # Return the PDF file
+        # Return the PDF file (served with sendfile where available)
         return FileResponse(
             path=str(pdf_path),
             filename=document.name,
@@ -74,7 +76,8 @@ async def download_document(
 @router.get("/{customer_id}/documents", response_model=DocumentListResponse)
 async def get_customer_documents(
     customer_id: str,
-    current_user: User = Depends(get_current_user)
+    current_user_id: UUID = Depends(get_current_user_id),
+    salesforce_service: SalesforceService = Depends(get_salesforce_service)
 ):
     """
     Retrieve all documents for a customer.
@@ -83,14 +86,17 @@ async def get_customer_documents(
     Requires authentication. Users can only access their own documents.
     """
     # Ensure user can only access their own data
-    if str(current_user.user_id) != customer_id:
+    if str(current_user_id) != customer_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only access your own documents"
         )
     
     try:
-        documents = salesforce_service.get_customer_documents(customer_id)
+        documents = await salesforce_service.get_customer_documents(customer_id)
+        if len(documents) > STREAM_THRESHOLD:
+            # Start sending before the whole list is serialized
+            return StreamingResponse(_stream_documents(documents), media_type="application/json")
         return DocumentListResponse(documents=documents)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving documents: {str(e)}")
@@ -101,7 +107,8 @@ async def upload_document(
     customer_id: str,
     file: UploadFile = File(...),
     document_type: str = Form(None),
-    current_user: User = Depends(get_current_user)
+    current_user_id: UUID = Depends(get_current_user_id),
+    salesforce_service: SalesforceService = Depends(get_salesforce_service)
 ):
     """
     Upload a document for a customer and sync it to Salesforce.
@@ -110,7 +117,7 @@ async def upload_document(
     The document will be synced to Salesforce via the SalesforceService.
     """
     # Ensure user can only upload to their own account
-    if str(current_user.user_id) != customer_id:
+    if str(current_user_id) != customer_id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only upload documents to your own account"
@@ -123,39 +130,28 @@ async def upload_document(
             detail="File name is required"
         )
     
-    # Read file content
+    # Use provided document type or default
+    doc_type = document_type if document_type else "Document"
+    
     try:
-        file_content = await file.read()
-        
-        # Validate file size (e.g., max 10MB)
-        MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
-        if len(file_content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File size exceeds maximum allowed size of {MAX_FILE_SIZE / (1024 * 1024)}MB"
-            )
-        
-        if len(file_content) == 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="File is empty"
-            )
-        
-        # Use provided document type or default
-        doc_type = document_type if document_type else "Document"
-        
-        # Upload to Salesforce via service
-        document = salesforce_service.upload_document(
+        # Upload to Salesforce via service, streaming the file and
+        # validating its size as it is written
+        document = await salesforce_service.upload_document(
             customer_id=customer_id,
-            file_content=file_content,
+            file_stream=file.file,
             filename=file.filename,
-            document_type=doc_type
+            document_type=doc_type,
+            max_size=MAX_FILE_SIZE
         )
         
         return document
         
-    except HTTPException:
-        raise
+    except ValueError as e:
+        # Empty or oversized file
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
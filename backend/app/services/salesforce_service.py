@@ -7,14 +7,78 @@ Even though we're using mocks, this service layer demonstrates:
 - Mapping logic isolation
 """
 
-import json
+import asyncio
+import logging
 import os
+import secrets
+import threading
+import time
+import uuid
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import BinaryIO, Callable, Iterable, List, NamedTuple, Optional
 from datetime import datetime
+
+import orjson
+
+try:
+    # Optional C parser, faster than datetime.fromisoformat on older Pythons
+    from ciso8601 import parse_datetime as _parse_iso
+except ImportError:
+    _parse_iso = datetime.fromisoformat
+
 from app.models.document import Document
 from app.models.case import Case, CaseCreateRequest
 
+logger = logging.getLogger(__name__)
+
+if os.getenv("SF_MOCK_DEBUG") == "1":
+    # Opt-in console output of the Salesforce mapping for local debugging
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(logging.StreamHandler())
+
+# Default location of the Salesforce mock data (backend/mocks/salesforce)
+DEFAULT_MOCK_DIR = Path(__file__).resolve().parents[2] / "mocks" / "salesforce"
+
+# How long customer case/document lists are served from memory
+CACHE_TTL_SECONDS = 30
+
+# Minimum time between the mock directory re-checks forced by document
+# lookups that miss the index
+INDEX_MISS_RECHECK_SECONDS = 1
+
+# Chunk size used when streaming uploaded files to disk
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Document type assigned to uploads without an explicit type
+DOCUMENT_TYPES_BY_EXTENSION = {
+    ".pdf": "PDF",
+    ".jpg": "Image",
+    ".jpeg": "Image",
+    ".png": "Image",
+    ".gif": "Image",
+    ".doc": "Word Document",
+    ".docx": "Word Document",
+    ".xls": "Spreadsheet",
+    ".xlsx": "Spreadsheet",
+}
+
+# Uploaded PDFs are stored as pdfs/<shard>/<document_id>.pdf, sharded by the
+# last two characters of the ID (every document ID starts with "069")
+PDF_SHARD_DIR = "pdfs"
+
+
+@lru_cache(maxsize=4096)
+def _parse_dt(value: str) -> datetime:
+    """Parse an ISO timestamp from a mock file (cached, datetimes are immutable)"""
+    return _parse_iso(value)
+
+
+class DocumentMeta(NamedTuple):
+    """Lightweight document record used to authorize downloads"""
+    customer_id: str
+    name: str
+
 
 class SalesforceService:
     """
@@ -28,74 +92,420 @@ class SalesforceService:
     """
     
     def __init__(self, mock_data_dir: str = None):
-        if mock_data_dir is None:
-            # Resolve path relative to backend directory
-            backend_dir = Path(__file__).parent.parent.parent
-            mock_data_dir = backend_dir / "mocks" / "salesforce"
-        self.mock_data_dir = Path(mock_data_dir)
-        self.mock_data_dir.mkdir(parents=True, exist_ok=True)
+        self.mock_data_dir = DEFAULT_MOCK_DIR if mock_data_dir is None else Path(mock_data_dir)
+        if not self.mock_data_dir.is_dir():
+            self.mock_data_dir.mkdir(parents=True, exist_ok=True)
+        # (kind, customer_id) -> (expires_at, (store path, st_mtime_ns), records)
+        self._cache: dict[tuple[str, str], tuple[float, tuple[Path, int], list]] = {}
+        # (kind, customer_id) -> write count, so a read that raced a write
+        # doesn't cache what it loaded before that write
+        self._cache_generation: dict[tuple[str, str], int] = {}
+        # document_id -> DocumentMeta and document_id -> PDF path, rebuilt
+        # when the mock directory's or a documents store's mtime changes
+        self._doc_index: dict[str, DocumentMeta] = {}
+        self._pdf_paths: dict[str, Path] = {}
+        self._dir_mtime_ns: Optional[int] = None
+        # documents store path -> st_mtime_ns the doc index was built from
+        self._doc_file_mtimes: dict[Path, int] = {}
+        # time.monotonic() of the last directory check, which is serialized
+        # by _dir_index_lock
+        self._dir_checked_at: Optional[float] = None
+        self._dir_index_lock = asyncio.Lock()
+        # path -> (st_mtime_ns, records) of per-customer NDJSON stores
+        self._records_cache: dict[Path, tuple[int, list[dict]]] = {}
+        self._records_lock = threading.RLock()
+    
+    async def _load_cached(self, kind: str, customer_id: str, loader: Callable[[Path], list]) -> list:
+        """
+        Return a customer's parsed list, re-reading the mock file only when needed.
+        
+        Within CACHE_TTL_SECONDS entries are served without touching the disk.
+        After that the file is stat'ed and only re-parsed if its mtime changed.
+        If the stat fails for any reason other than a missing file, the last
+        good value is returned. Disk access runs in a worker thread.
+        """
+        entry = self._cache.get((kind, customer_id))
+        if entry is not None and entry[0] > time.monotonic():
+            return list(entry[2])
+        return await asyncio.to_thread(self._refresh_cached, kind, customer_id, loader)
+    
+    def _refresh_cached(self, kind: str, customer_id: str, loader: Callable[[Path], list]) -> list:
+        """Blocking part of _load_cached: stat the mock file and re-parse if it changed"""
+        key = (kind, customer_id)
+        entry = self._cache.get(key)
+        generation = self._cache_generation.get(key, 0)
+        now = time.monotonic()
+        
+        try:
+            source = self._stat_store(kind, customer_id)
+        except OSError:
+            if entry is not None:
+                return list(entry[2])
+            raise
+        
+        if source is None:
+            self._cache.pop(key, None)
+            return []
+        
+        if entry is not None and entry[1] == source:
+            records = entry[2]
+        else:
+            records = loader(source[0])
+        with self._records_lock:
+            # Only cache if no write was invalidated since we stat'ed
+            if self._cache_generation.get(key, 0) == generation:
+                self._cache[key] = (now + CACHE_TTL_SECONDS, source, records)
+        return list(records)
+    
+    @staticmethod
+    def _read_json(path: Path):
+        """Read and parse a mock JSON file"""
+        return orjson.loads(path.read_bytes())
+    
+    @staticmethod
+    def _write_json(path: Path, obj) -> None:
+        """Atomically replace a mock file with obj serialized as indented JSON"""
+        # Unique temp name so concurrent writers never share a temp file
+        tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_path, path)
+    
+    @staticmethod
+    def _append_ndjson(path: Path, obj) -> None:
+        """Append obj as a single JSON line to a mock log file"""
+        with open(path, 'ab') as f:
+            f.write(orjson.dumps(obj) + b"\n")
+    
+    def _customer_file(self, kind: str, customer_id: str) -> Path:
+        """Path of a customer's cases/documents store (one JSON record per line)"""
+        return self.mock_data_dir / f"{kind}-{customer_id}.ndjson"
+    
+    def _legacy_file(self, kind: str, customer_id: str) -> Path:
+        """Path of a customer's legacy {kind: [...]} JSON store"""
+        return self.mock_data_dir / f"{kind}-{customer_id}.json"
+    
+    def _stat_store(self, kind: str, customer_id: str) -> Optional[tuple[Path, int]]:
+        """
+        Return (path, st_mtime_ns) of a customer's store, or None if there is none.
+        
+        The NDJSON store wins; a legacy JSON store is read as-is, since the
+        read path must work on a read-only mock directory. It is only
+        converted by the next write (see _append_record).
+        """
+        for path in (self._customer_file(kind, customer_id), self._legacy_file(kind, customer_id)):
+            try:
+                return path, path.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return None
+    
+    def _migrate_legacy_file(self, kind: str, customer_id: str) -> bool:
+        """
+        Convert a legacy {kind}-{customer_id}.json file ({kind: [...]}) to NDJSON.
+        
+        Only called on the write path. Returns False if the customer has
+        neither file.
+        """
+        path = self._customer_file(kind, customer_id)
+        legacy_path = self._legacy_file(kind, customer_id)
+        with self._records_lock:
+            if path.exists():
+                return True
+            try:
+                records = self._read_json(legacy_path).get(kind, [])
+            except FileNotFoundError:
+                return False
+            tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+            tmp_path.write_bytes(b"".join(orjson.dumps(record) + b"\n" for record in records))
+            os.replace(tmp_path, path)
+            legacy_path.unlink(missing_ok=True)
+            self._records_cache.pop(legacy_path, None)
+        return True
     
-    def get_customer_documents(self, customer_id: str) -> List[Document]:
+    def _load_records(self, path: Path) -> list[dict]:
+        """
+        Return the records of a store, re-parsing only if its mtime changed.
+        
+        NDJSON stores hold one record per line; legacy .json stores a single
+        {kind: [...]} object.
+        
+        The returned list is shared with the cache: readers must not modify
+        it, writers only do so through _append_record.
+        """
+        try:
+            mtime_ns = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return []
+        
+        entry = self._records_cache.get(path)
+        if entry is not None and entry[0] == mtime_ns:
+            return entry[1]
+        
+        try:
+            raw = path.read_bytes()
+        except FileNotFoundError:
+            # Removed since the stat above
+            return []
+        if path.suffix == ".json":
+            records = orjson.loads(raw).get(path.name.split("-", 1)[0], [])
+        else:
+            records = [orjson.loads(line) for line in raw.splitlines() if line]
+        self._records_cache[path] = (mtime_ns, records)
+        return records
+    
+    def _append_record(self, kind: str, customer_id: str, record: dict) -> None:
+        """
+        Append a record to a customer's store with a single O(1) write.
+        
+        A cached copy that was current before the append is extended in
+        place, so the next read does not re-parse the file.
+        """
+        path = self._customer_file(kind, customer_id)
+        with self._records_lock:
+            try:
+                mtime_before = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                mtime_before = None
+                if self._migrate_legacy_file(kind, customer_id):
+                    mtime_before = path.stat().st_mtime_ns
+            
+            self._append_ndjson(path, record)
+            
+            entry = self._records_cache.get(path)
+            if entry is not None and entry[0] == mtime_before:
+                entry[1].append(record)
+                self._records_cache[path] = (path.stat().st_mtime_ns, entry[1])
+            else:
+                self._records_cache.pop(path, None)
+        self._invalidate_cache(kind, customer_id)
+    
+    def clear_cache(self) -> None:
+        """Forget everything cached from the mock directory"""
+        with self._records_lock:
+            self._cache.clear()
+            self._records_cache.clear()
+            self._doc_index = {}
+            self._pdf_paths = {}
+            self._dir_mtime_ns = None
+            self._doc_file_mtimes = {}
+            self._dir_checked_at = None
+    
+    def _invalidate_cache(self, kind: str, customer_id: str) -> None:
+        """Drop a customer's cached list after a write"""
+        key = (kind, customer_id)
+        with self._records_lock:
+            self._cache_generation[key] = self._cache_generation.get(key, 0) + 1
+            self._cache.pop(key, None)
+    
+    async def get_customer_documents(self, customer_id: str) -> List[Document]:
         """
         Retrieve documents for a customer from Salesforce.
         
         In production, this would call:
         GET /services/data/v58.0/sobjects/ContentDocumentLink/
         with filters for the customer account.
+        
+        Results are cached per customer (see _load_cached).
+        """
+        return await self._load_cached("documents", customer_id, self._load_documents)
+    
+    def _load_documents(self, mock_file: Path) -> List[Document]:
+        """Parse a documents mock file and map it to our DTOs"""
+        # Map Salesforce response to our DTO
+        return [self._map_document(doc) for doc in self._load_records(mock_file)]
+    
+    async def lookup_document(self, document_id: str) -> Optional[DocumentMeta]:
         """
-        mock_file = self.mock_data_dir / f"documents-{customer_id}.json"
+        Find the owner and name of a document with a single dict lookup.
         
-        if not mock_file.exists():
-            return []
+        The index is built by scanning every documents-*.ndjson file once (see
+        _refresh_dir_index). A miss re-checks the mock directory right away,
+        since the document may have been added since the last check.
+        """
+        await self._ensure_dir_index()
+        meta = self._doc_index.get(document_id)
+        if meta is None:
+            await self._ensure_dir_index(force=True)
+            meta = self._doc_index.get(document_id)
+        return meta
+    
+    async def get_pdf_path(self, document_id: str) -> Optional[Path]:
+        """Return the path of a document's PDF, or None, without stat'ing the file"""
+        await self._ensure_dir_index()
+        pdf_path = self._pdf_paths.get(document_id)
+        if pdf_path is None:
+            await self._ensure_dir_index(force=True)
+            pdf_path = self._pdf_paths.get(document_id)
+        return pdf_path
+    
+    async def _ensure_dir_index(self, force: bool = False) -> None:
+        """
+        Refresh the directory indexes in a worker thread if anything changed.
         
-        with open(mock_file, 'r') as f:
-            data = json.load(f)
+        Like _load_cached, the mock directory is only stat'ed once per
+        CACHE_TTL_SECONDS. force (an index miss) shortens that to
+        INDEX_MISS_RECHECK_SECONDS, so lookups of unknown IDs can't make
+        every request stat every documents store.
+        """
+        interval = INDEX_MISS_RECHECK_SECONDS if force else CACHE_TTL_SECONDS
+        if self._dir_checked_recently(interval):
+            return
+        async with self._dir_index_lock:
+            # Another lookup may have refreshed while we waited
+            if not self._dir_checked_recently(interval):
+                await asyncio.to_thread(self._refresh_dir_index)
+    
+    def _dir_checked_recently(self, interval: float) -> bool:
+        """Whether the mock directory was checked less than interval seconds ago"""
+        return self._dir_checked_at is not None and time.monotonic() - self._dir_checked_at < interval
+    
+    def _refresh_dir_index(self) -> None:
+        """
+        Rebuild the document index and PDF paths if the mock directory changed.
         
-        # Map Salesforce response to our DTO
-        documents = []
-        for doc in data.get('documents', []):
-            documents.append(Document(
-                document_id=doc['document_id'],
-                customer_id=doc['customer_id'],
-                name=doc['name'],
-                type=doc['type'],
-                download_url=doc['download_url'],
-                created_date=datetime.fromisoformat(doc['created_date']) if doc.get('created_date') else None
-            ))
+        The directory's mtime changes whenever a file in it is added, removed
+        or atomically replaced. Appending to an existing documents store
+        doesn't change it, so the stores' own mtimes are checked as well.
+        """
+        self._dir_checked_at = time.monotonic()
+        mtime_ns = self.mock_data_dir.stat().st_mtime_ns
+        dir_changed = mtime_ns != self._dir_mtime_ns
+        if dir_changed:
+            # Legacy stores first so a customer's NDJSON store wins if both exist
+            doc_files = [
+                *self.mock_data_dir.glob("documents-*.json"),
+                *self.mock_data_dir.glob("documents-*.ndjson"),
+            ]
+        else:
+            doc_files = list(self._doc_file_mtimes)
+        
+        doc_file_mtimes = {}
+        for path in doc_files:
+            try:
+                doc_file_mtimes[path] = path.stat().st_mtime_ns
+            except FileNotFoundError:
+                continue
+        
+        if dir_changed or doc_file_mtimes != self._doc_file_mtimes:
+            self._doc_index = self._build_doc_index(doc_file_mtimes)
+            self._doc_file_mtimes = doc_file_mtimes
+        if dir_changed:
+            self._pdf_paths = self._scan_pdfs()
+            self._dir_mtime_ns = mtime_ns
+    
+    def _build_doc_index(self, mock_files: Iterable[Path]) -> dict[str, DocumentMeta]:
+        """Scan documents mock files into a document_id -> DocumentMeta map"""
+        index = {}
+        for mock_file in mock_files:
+            for doc in self._load_records(mock_file):
+                index[doc['document_id']] = DocumentMeta(doc['customer_id'], doc['name'])
+        return index
+    
+    def _scan_pdfs(self) -> dict[str, Path]:
+        """
+        Map document IDs to PDF files with os.scandir.
         
-        return documents
+        Covers both the sharded layout and PDFs stored flat in the mock
+        directory (the bundled sample documents); sharded files win.
+        """
+        pdf_paths = {}
+        with os.scandir(self.mock_data_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".pdf"):
+                    pdf_paths[entry.name[:-4]] = Path(entry.path)
+        
+        try:
+            shards = os.scandir(self.mock_data_dir / PDF_SHARD_DIR)
+        except FileNotFoundError:
+            return pdf_paths
+        with shards:
+            for shard in shards:
+                if not shard.is_dir():
+                    continue
+                with os.scandir(shard.path) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".pdf"):
+                            pdf_paths[entry.name[:-4]] = Path(entry.path)
+        return pdf_paths
+    
+    def _pdf_shard_path(self, document_id: str) -> Path:
+        """Where an uploaded document's PDF is stored"""
+        return self.mock_data_dir / PDF_SHARD_DIR / document_id[-2:] / f"{document_id}.pdf"
     
-    def get_customer_cases(self, customer_id: str) -> List[Case]:
+    def _index_document(self, document_id: str, meta: DocumentMeta, pdf_path: Path) -> None:
+        """
+        Add a document we just wrote to the indexes so it is found right away.
+        
+        The recorded mtimes are left alone: other processes may have written
+        to the mock directory since the last refresh, and the next refresh
+        has to see that.
+        """
+        if self._dir_mtime_ns is not None:
+            self._doc_index[document_id] = meta
+            self._pdf_paths[document_id] = pdf_path
+    
+    @staticmethod
+    def _map_document(doc: dict) -> Document:
+        """
+        Map a Salesforce document record to our DTO.
+        
+        The records come from our own mock writer, so validation is skipped
+        with model_construct. The result is shared through the cache and
+        must be treated as read-only.
+        """
+        created_date = doc.get('created_date')
+        return Document.model_construct(
+            document_id=doc['document_id'],
+            customer_id=doc['customer_id'],
+            name=doc['name'],
+            type=doc['type'],
+            download_url=doc['download_url'],
+            created_date=_parse_dt(created_date) if created_date else None
+        )
+    
+    async def get_customer_cases(self, customer_id: str) -> List[Case]:
         """
         Retrieve cases/tickets for a customer from Salesforce.
         
         In production, this would call:
         GET /services/data/v58.0/query/?q=SELECT+Id,Subject,Description,Status,CreatedDate+FROM+Case+WHERE+AccountId='{customer_id}'
-        """
-        mock_file = self.mock_data_dir / f"cases-{customer_id}.json"
-        
-        if not mock_file.exists():
-            return []
         
-        with open(mock_file, 'r') as f:
-            data = json.load(f)
+        Results are cached per customer (see _load_cached).
+        """
+        return await self._load_cached("cases", customer_id, self._load_cases)
+    
+    async def get_customer_bundle(self, customer_id: str) -> tuple[List[Document], List[Case]]:
+        """
+        Retrieve a customer's documents and cases together.
         
-        # Map Salesforce response to our DTO
-        cases = []
-        for case_data in data.get('cases', []):
-            cases.append(Case(
+        Both loads run concurrently, so a cold dashboard load costs one
+        round-trip instead of two; cached entries are returned without
+        leaving the event loop.
+        """
+        documents, cases = await asyncio.gather(
+            self.get_customer_documents(customer_id),
+            self.get_customer_cases(customer_id)
+        )
+        return documents, cases
+    
+    def _load_cases(self, mock_file: Path) -> List[Case]:
+        """Parse a cases mock file and map it to our DTOs"""
+        # Map Salesforce response to our DTO; trusted data, so skip validation
+        # (results are shared through the cache and must be treated as read-only)
+        return [
+            Case.model_construct(
                 case_id=case_data['case_id'],
                 customer_id=case_data['customer_id'],
                 subject=case_data['subject'],
                 description=case_data.get('description'),
                 type=case_data.get('type'),
                 status=case_data['status'],
-                created_date=datetime.fromisoformat(case_data['created_date'])
-            ))
-        
-        return cases
+                created_date=_parse_dt(case_data['created_date'])
+            )
+            for case_data in self._load_records(mock_file)
+        ]
     
-    def create_case(self, customer_id: str, case_request: CaseCreateRequest) -> Case:
+    async def create_case(self, customer_id: str, case_request: CaseCreateRequest) -> Case:
         """
         Create a new case in Salesforce.
         
@@ -106,14 +516,20 @@ class SalesforceService:
         
         For MVP, we simulate by:
         - Generating a mock case ID
-        - Saving temporarily as "eingehend" (incoming)
-        - Sending to Salesforce mock endpoint (new-case.json or console)
+        - Appending it as "eingehend" (incoming) to an NDJSON log
+        - Sending to Salesforce mock endpoint (new-case.json and debug log)
         - Appending to mock file
         - Returning the created case
+        
+        new-case.json holds the last mock API response only and is replaced
+        atomically; the NDJSON files are the history.
         """
+        return await asyncio.to_thread(self._create_case, customer_id, case_request)
+    
+    def _create_case(self, customer_id: str, case_request: CaseCreateRequest) -> Case:
+        """Blocking implementation of create_case"""
         # Generate mock case ID (in production, Salesforce returns this)
-        import uuid
-        case_id = f"500{str(uuid.uuid4()).replace('-', '')[:15]}"
+        case_id = f"500{secrets.token_hex(8)[:15]}"
         
         # Create case object with status "eingehend" (incoming) initially
         new_case = Case(
@@ -138,76 +554,52 @@ class SalesforceService:
             "Type": new_case.type,
             "Status": "New",  # Salesforce status (mapped from "eingehend")
             "Origin": "Web",
-            "CreatedDate": new_case.created_date.isoformat()
+            "CreatedDate": new_case.created_date
         }
         
         # Send to Salesforce Mock Endpoint
         # Option 1: Save to new-case.json file (simulating Salesforce API call)
         new_case_file = self.mock_data_dir / "new-case.json"
-        with open(new_case_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "success": True,
-                "id": salesforce_case_data["Id"],
-                "salesforce_case": salesforce_case_data
-            }, f, indent=2, ensure_ascii=False)
-        
-        # Option 2: Also log to console to make mapping logic visible
-        print("\n" + "="*60)
-        print("SALESFORCE MOCK ENDPOINT: New Case Received")
-        print("="*60)
-        print(f"Mapping from internal DTO to Salesforce format:")
-        print(f"  Internal Status: '{new_case.status}' → Salesforce Status: '{salesforce_case_data['Status']}'")
-        print(f"  Internal Type: '{new_case.type}' → Salesforce Type: '{salesforce_case_data['Type']}'")
-        print(f"  Customer ID: '{new_case.customer_id}' → Salesforce AccountId: '{salesforce_case_data['AccountId']}'")
-        print(f"\nSalesforce Case Data:")
-        print(json.dumps(salesforce_case_data, indent=2, ensure_ascii=False))
-        print("="*60 + "\n")
-        
-        # Save temporarily locally (as "eingehend")
-        # In production, this would be in a temporary queue/database
-        temp_file = self.mock_data_dir / f"incoming-cases-{customer_id}.json"
-        if temp_file.exists():
-            with open(temp_file, 'r', encoding='utf-8') as f:
-                temp_data = json.load(f)
-        else:
-            temp_data = {"incoming_cases": []}
+        self._write_json(new_case_file, {
+            "success": True,
+            "id": salesforce_case_data["Id"],
+            "salesforce_case": salesforce_case_data
+        })
         
-        temp_data['incoming_cases'].append({
+        # Option 2: Also log the mapping (DEBUG only, serialized lazily)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Salesforce mock: new case, status %r -> %r, type %r -> %r: %s",
+                new_case.status, salesforce_case_data["Status"],
+                new_case.type, salesforce_case_data["Type"],
+                orjson.dumps(salesforce_case_data).decode()
+            )
+        
+        # Internal record, shared by the incoming log and the cases file
+        # (created_date as a string, matching what readers get from disk)
+        case_record = {
             "case_id": new_case.case_id,
             "customer_id": new_case.customer_id,
             "subject": new_case.subject,
             "description": new_case.description,
             "type": new_case.type,
             "status": new_case.status,  # "eingehend"
-            "created_date": new_case.created_date.isoformat(),
-            "salesforce_mapped": salesforce_case_data
-        })
+            "created_date": new_case.created_date.isoformat()
+        }
         
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            json.dump(temp_data, f, indent=2, ensure_ascii=False)
+        # Save temporarily locally (as "eingehend")
+        # In production, this would be in a temporary queue/database
+        self._append_ndjson(
+            self.mock_data_dir / f"incoming-cases-{customer_id}.ndjson",
+            {**case_record, "salesforce_mapped": salesforce_case_data}
+        )
         
         # Also append to main cases file (for GET endpoint)
-        mock_file = self.mock_data_dir / f"cases-{customer_id}.json"
-        if mock_file.exists():
-            with open(mock_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        else:
-            data = {"cases": []}
-        
-        # Append new case (with status updated to match Salesforce response)
-        data['cases'].append({
-            "case_id": new_case.case_id,
-            "customer_id": new_case.customer_id,
-            "subject": new_case.subject,
-            "description": new_case.description,
-            "type": new_case.type,
-            "status": salesforce_case_data["Status"],  # Use Salesforce status
-            "created_date": new_case.created_date.isoformat()
-        })
-        
-        # Write back to mock file
-        with open(mock_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        self._append_record(
+            "cases",
+            customer_id,
+            {**case_record, "status": salesforce_case_data["Status"]}
+        )
         
         # Update the case status to match what Salesforce would return
         new_case.status = salesforce_case_data["Status"]
@@ -219,7 +611,14 @@ class SalesforceService:
         
         return new_case
     
-    def upload_document(self, customer_id: str, file_content: bytes, filename: str, document_type: str = "Document") -> Document:
+    async def upload_document(
+        self,
+        customer_id: str,
+        file_stream: BinaryIO,
+        filename: str,
+        document_type: str = "Document",
+        max_size: Optional[int] = None
+    ) -> Document:
         """
         Upload a document to Salesforce.
         
@@ -230,39 +629,45 @@ class SalesforceService:
         4. Return Salesforce document ID
         
         For MVP, we simulate by:
-        - Saving file to mock directory
+        - Streaming the file to the mock directory in UPLOAD_CHUNK_SIZE chunks
         - Generating a mock document ID
         - Creating document record in Salesforce format
-        - Appending to documents JSON file
+        - Appending to documents NDJSON file
         - Returning the created document
-        """
-        import uuid
-        import mimetypes
         
+        new-document.json holds the last mock API response only and is
+        replaced atomically, which also bumps the directory mtime that the
+        document index watches.
+        
+        Raises ValueError if the file is empty or larger than max_size bytes.
+        """
+        return await asyncio.to_thread(
+            self._upload_document, customer_id, file_stream, filename, document_type, max_size
+        )
+    
+    def _upload_document(
+        self,
+        customer_id: str,
+        file_stream: BinaryIO,
+        filename: str,
+        document_type: str,
+        max_size: Optional[int]
+    ) -> Document:
+        """Blocking implementation of upload_document"""
         # Generate mock document ID (in production, Salesforce returns this)
-        document_id = f"069{str(uuid.uuid4()).replace('-', '')[:15]}"
+        document_id = f"069{secrets.token_hex(8)[:15]}"
         
         # Determine file type from extension if not provided
         file_ext = Path(filename).suffix.lower()
         if not document_type or document_type == "Document":
-            if file_ext in ['.pdf']:
-                document_type = "PDF"
-            elif file_ext in ['.jpg', '.jpeg', '.png', '.gif']:
-                document_type = "Image"
-            elif file_ext in ['.doc', '.docx']:
-                document_type = "Word Document"
-            elif file_ext in ['.xls', '.xlsx']:
-                document_type = "Spreadsheet"
-            else:
-                document_type = "Document"
+            document_type = DOCUMENT_TYPES_BY_EXTENSION.get(file_ext, "Document")
         
-        # Save file to mock directory
-        pdf_filename = f"{document_id}.pdf"
+        # Save file to its shard in the mock directory
         # For simplicity, we'll save all files as PDFs in the mock
         # In production, we'd preserve the original file format
-        file_path = self.mock_data_dir / pdf_filename
-        with open(file_path, 'wb') as f:
-            f.write(file_content)
+        file_path = self._pdf_shard_path(document_id)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_size = self._save_upload(file_stream, file_path, max_size)
         
         # Create document object
         created_date = datetime.now()
@@ -285,56 +690,43 @@ class SalesforceService:
             "Id": new_document.document_id,
             "Title": new_document.name,
             "FileExtension": file_ext.lstrip('.') if file_ext else "",
-            "ContentSize": len(file_content),
+            "ContentSize": file_size,
             "ContentUrl": download_url,
             "FirstPublishLocationId": customer_id,  # Link to Account
-            "CreatedDate": new_document.created_date.isoformat(),
+            "CreatedDate": new_document.created_date,
             "Type": new_document.type
         }
         
         # Send to Salesforce Mock Endpoint
         new_document_file = self.mock_data_dir / "new-document.json"
-        with open(new_document_file, 'w', encoding='utf-8') as f:
-            json.dump({
-                "success": True,
-                "id": salesforce_document_data["Id"],
-                "salesforce_document": salesforce_document_data
-            }, f, indent=2, ensure_ascii=False)
-        
-        # Log to console to make mapping logic visible
-        print("\n" + "="*60)
-        print("SALESFORCE MOCK ENDPOINT: New Document Uploaded")
-        print("="*60)
-        print(f"Mapping from internal DTO to Salesforce format:")
-        print(f"  Document ID: '{new_document.document_id}'")
-        print(f"  Customer ID: '{new_document.customer_id}' → Salesforce AccountId: '{salesforce_document_data['FirstPublishLocationId']}'")
-        print(f"  File Name: '{new_document.name}' → Salesforce Title: '{salesforce_document_data['Title']}'")
-        print(f"  File Size: {salesforce_document_data['ContentSize']} bytes")
-        print(f"\nSalesforce Document Data:")
-        print(json.dumps(salesforce_document_data, indent=2, ensure_ascii=False))
-        print("="*60 + "\n")
-        
-        # Update documents JSON file
-        mock_file = self.mock_data_dir / f"documents-{customer_id}.json"
-        if mock_file.exists():
-            with open(mock_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        else:
-            data = {"documents": []}
-        
-        # Append new document
-        data['documents'].append({
-            "document_id": new_document.document_id,
-            "customer_id": new_document.customer_id,
-            "name": new_document.name,
-            "type": new_document.type,
-            "download_url": new_document.download_url,
-            "created_date": new_document.created_date.isoformat()
+        self._write_json(new_document_file, {
+            "success": True,
+            "id": salesforce_document_data["Id"],
+            "salesforce_document": salesforce_document_data
         })
         
-        # Write back to mock file
-        with open(mock_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # Log the mapping (DEBUG only, serialized lazily)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Salesforce mock: new document %s (%d bytes): %s",
+                new_document.document_id, file_size,
+                orjson.dumps(salesforce_document_data).decode()
+            )
+        
+        # Append new document to the customer's documents file
+        self._append_record(
+            "documents",
+            customer_id,
+            {
+                "document_id": new_document.document_id,
+                "customer_id": new_document.customer_id,
+                "name": new_document.name,
+                "type": new_document.type,
+                "download_url": new_document.download_url,
+                "created_date": new_document.created_date.isoformat()
+            }
+        )
+        self._index_document(document_id, DocumentMeta(customer_id, filename), file_path)
         
         # In production, we would also:
         # - Upload file to Salesforce ContentVersion
@@ -342,4 +734,31 @@ class SalesforceService:
         # - Handle file versioning
         # - Trigger notifications/webhooks
         
-        return new_document
\ No newline at end of file
+        return new_document
+    
+    @staticmethod
+    def _save_upload(file_stream: BinaryIO, file_path: Path, max_size: Optional[int]) -> int:
+        """
+        Stream an upload to file_path and return its size in bytes.
+        
+        Writes to a temporary sibling and renames it into place, so an
+        oversized or empty upload never leaves a partial file behind.
+        """
+        tmp_path = file_path.with_name(file_path.name + ".part")
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                while chunk := file_stream.read(UPLOAD_CHUNK_SIZE):
+                    size += len(chunk)
+                    if max_size is not None and size > max_size:
+                        raise ValueError(
+                            f"File size exceeds maximum allowed size of {max_size / (1024 * 1024)}MB"
+                        )
+                    f.write(chunk)
+            if size == 0:
+                raise ValueError("File is empty")
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return size
@@ -81,6 +81,7 @@ echo "Preparing files in temporary directory: $TEMP_DIR"
 cp -r "$SCRIPT_DIR/app" "$TEMP_DIR/"
 cp -r "$SCRIPT_DIR/mocks" "$TEMP_DIR/"
 cp "$SCRIPT_DIR/requirements.txt" "$TEMP_DIR/"
+cp "$SCRIPT_DIR/init_db.py" "$TEMP_DIR/"
 
 # Copy systemd service file if it exists
 if [ -f "$SCRIPT_DIR/customer-portal-api.service" ]; then
@@ -106,7 +107,7 @@ source venv/bin/activate
 pip install --upgrade pip
 pip install -r requirements.txt
 # Bind to 127.0.0.1 for security when behind Apache reverse proxy
-uvicorn app.main:app --host 127.0.0.1 --port 8000
+uvicorn app.main:app --host 127.0.0.1 --port 8000 --http httptools --loop uvloop
 EOF
 chmod +x "$TEMP_DIR/start.sh"
 
@@ -127,6 +128,12 @@ ssh "$REMOTE_USER@$REMOTE_HOST" "cd $REMOTE_DIR && \
     pip install --upgrade pip && \
     pip install -r requirements.txt"
 
+# Create database tables once per deploy (workers no longer do this on startup)
+echo "Initializing database schema on remote server..."
+ssh "$REMOTE_USER@$REMOTE_HOST" "cd $REMOTE_DIR && \
+    source venv/bin/activate && \
+    python init_db.py"
+
 # Set proper permissions on remote server
 echo "Setting permissions on remote server..."
 ssh "$REMOTE_USER@$REMOTE_HOST" "chown -R www-data:www-data $REMOTE_DIR && chmod +x $REMOTE_DIR/start.sh"
@@ -1,17 +1,57 @@
 """
 Database initialization script.
-Run this script to create all database tables.
+Run this script to create all database tables and bring an existing
+database up to date with the models. Safe to run on every deploy.
 """
 import asyncio
+from sqlalchemy import inspect, text
 from app.database import engine, Base
 from app.models.user import User  # Import all models to register them
 
+# PostgreSQL advisory lock key shared by all init_db.py runs
+SCHEMA_LOCK_ID = 7_342_001
+
+
+def upgrade_schema(conn) -> None:
+    """
+    Apply model changes that create_all doesn't make to an existing users table.
+
+    create_all only creates missing tables, so columns and indexes added or
+    changed since a table was created are handled here. Every step checks the
+    current schema first, so running it again is a no-op.
+    """
+    inspector = inspect(conn)
+    columns = {column["name"]: column for column in inspector.get_columns("users")}
+    indexes = {index["name"] for index in inspector.get_indexes("users")}
+
+    # Reset tokens are stored as SHA-256 hashes; outstanding plaintext
+    # tokens are dropped, so those users have to request a new one
+    if "reset_password_token_hash" not in columns:
+        conn.execute(text("ALTER TABLE users ADD COLUMN reset_password_token_hash VARCHAR(64)"))
+    if "ix_users_reset_password_token_expires" in indexes:
+        conn.execute(text("DROP INDEX ix_users_reset_password_token_expires"))
+    for column in ("reset_password_token", "token"):
+        if column in columns:
+            conn.execute(text(f"ALTER TABLE users DROP COLUMN {column}"))
+
+    # bcrypt hashes are always 60 characters. SQLite ignores VARCHAR
+    # lengths, so only the production PostgreSQL column is narrowed
+    if conn.dialect.name == "postgresql" and columns["password"]["type"].length != 60:
+        conn.execute(text("ALTER TABLE users ALTER COLUMN password TYPE VARCHAR(60)"))
+
+    for index in User.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
 
 async def init_db():
-    """Create all database tables"""
+    """Create missing tables and upgrade existing ones"""
     async with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            # Overlapping deploys apply the DDL one after the other
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": SCHEMA_LOCK_ID})
         await conn.run_sync(Base.metadata.create_all)
-    print("Database tables created successfully!")
+        await conn.run_sync(upgrade_schema)
+    print("Database schema is up to date!")
 
 
 if __name__ == "__main__":
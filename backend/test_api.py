@@ -19,6 +19,10 @@ from datetime import datetime
 
 API_BASE = "http://localhost:8000"
 
+# One keep-alive connection for all calls; the bearer token is added after login
+SESSION = requests.Session()
+SESSION.headers.update({"User-Agent": "portal-smoke-test"})
+
 def print_section(title):
     """Print a formatted section header"""
     print("\n" + "="*60)
@@ -38,7 +42,7 @@ def register_user(email="test@example.com", password="testpassword123"):
     print_section("Step 1: Registering New User")
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE}/auth/register",
             json={
                 "email": email,
@@ -52,6 +56,7 @@ def register_user(email="test@example.com", password="testpassword123"):
             data = response.json()
             token = data["access_token"]
             user_id = str(data["user"]["user_id"])
+            SESSION.headers["Authorization"] = f"Bearer {token}"
             print_success(f"Registered successfully!")
             print(f"  User ID: {user_id}")
             print(f"  Email: {data['user']['email']}")
@@ -77,7 +82,7 @@ def login_user(email="test@example.com", password="testpassword123"):
     print_section("Step 1: Logging In")
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE}/auth/login",
             json={
                 "email": email,
@@ -90,6 +95,7 @@ def login_user(email="test@example.com", password="testpassword123"):
             data = response.json()
             token = data["access_token"]
             user_id = str(data["user"]["user_id"])
+            SESSION.headers["Authorization"] = f"Bearer {token}"
             print_success(f"Logged in successfully!")
             print(f"  User ID: {user_id}")
             print(f"  Email: {data['user']['email']}")
@@ -106,18 +112,13 @@ def login_user(email="test@example.com", password="testpassword123"):
         print_error(f"Error: {str(e)}")
         return None, None
 
-def get_documents(token, user_id):
+def get_documents(user_id):
     """Get documents for the user"""
     print_section("Step 2: Getting Documents")
     
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
-    
     try:
-        response = requests.get(
+        response = SESSION.get(
             f"{API_BASE}/customer/{user_id}/documents",
-            headers=headers,
             timeout=5
         )
         
@@ -133,7 +134,7 @@ def get_documents(token, user_id):
                     print(f"     ID: {doc['document_id']}")
             else:
                 print("  No documents found. Create mock data in:")
-                print(f"    backend/mocks/salesforce/documents-{user_id}.json")
+                print(f"    backend/mocks/salesforce/documents-{user_id}.ndjson")
             
             return documents
         else:
@@ -144,18 +145,13 @@ def get_documents(token, user_id):
         print_error(f"Error: {str(e)}")
         return []
 
-def get_cases(token, user_id):
+def get_cases(user_id):
     """Get cases/tickets for the user"""
     print_section("Step 3: Getting Cases/Tickets")
     
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
-    
     try:
-        response = requests.get(
+        response = SESSION.get(
             f"{API_BASE}/customer/{user_id}/cases",
-            headers=headers,
             timeout=5
         )
         
@@ -172,7 +168,7 @@ def get_cases(token, user_id):
                     print(f"     ID: {case['case_id']}")
             else:
                 print("  No cases found. Create mock data in:")
-                print(f"    backend/mocks/salesforce/cases-{user_id}.json")
+                print(f"    backend/mocks/salesforce/cases-{user_id}.ndjson")
             
             return cases
         else:
@@ -183,15 +179,10 @@ def get_cases(token, user_id):
         print_error(f"Error: {str(e)}")
         return []
 
-def create_case(token, user_id, subject, description=None):
+def create_case(user_id, subject, description=None):
     """Create a new case/ticket"""
     print_section("Step 4: Creating New Case/Ticket")
     
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
-    
     case_data = {
         "subject": subject,
     }
@@ -200,9 +191,8 @@ def create_case(token, user_id, subject, description=None):
         case_data["description"] = description
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{API_BASE}/customer/{user_id}/cases",
-            headers=headers,
             json=case_data,
             timeout=5
         )
@@ -216,8 +206,8 @@ def create_case(token, user_id, subject, description=None):
             print("\n  📝 Note: Check the backend console to see the Salesforce mapping logic!")
             print("  📁 Files created/updated:")
             print(f"     - backend/mocks/salesforce/new-case.json")
-            print(f"     - backend/mocks/salesforce/incoming-cases-{user_id}.json")
-            print(f"     - backend/mocks/salesforce/cases-{user_id}.json")
+            print(f"     - backend/mocks/salesforce/incoming-cases-{user_id}.ndjson")
+            print(f"     - backend/mocks/salesforce/cases-{user_id}.ndjson")
             return data
         else:
             print_error(f"Failed to create case: {response.status_code}")
@@ -241,15 +231,14 @@ def main():
         sys.exit(1)
     
     # Step 2: Get documents
-    documents = get_documents(token, user_id)
+    documents = get_documents(user_id)
     
     # Step 3: Get cases
-    cases = get_cases(token, user_id)
+    cases = get_cases(user_id)
     
     # Step 4: Create a new case
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     new_case = create_case(
-        token,
         user_id,
         subject=f"Test Ticket - Created at {timestamp}",
         description="This is a test ticket created via the API test script."
@@ -3,16 +3,21 @@ Pytest configuration and shared fixtures
 """
 import pytest
 import os
+import shutil
 import asyncio
-from typing import AsyncGenerator
-from httpx import AsyncClient
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from typing import AsyncGenerator, Generator
+from httpx import ASGITransport, AsyncClient, Headers
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.routes import auth as auth_routes
 from app.database import get_db, Base
 from app.models.user import User
 from app.core.security import get_password_hash, create_access_token
+from app.core.dependencies import get_salesforce_service
+from app.services.salesforce_service import SalesforceService
 
 
 # Use in-memory SQLite for testing
@@ -27,59 +32,128 @@ test_engine = create_async_engine(
     poolclass=StaticPool,
 )
 
-TestSessionLocal = async_sessionmaker(
-    test_engine, class_=AsyncSession, expire_on_commit=False
-)
 
 
-@pytest.fixture(scope="function")
-async def db_session() -> AsyncGenerator[AsyncSession, None]:
-    """Create a test database session"""
+# SQLite's driver manages transactions itself and breaks SAVEPOINT;
+# let SQLAlchemy emit BEGIN so tests can roll back nested transactions
+@event.listens_for(test_engine.sync_engine, "connect")
+def _disable_driver_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(test_engine.sync_engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session")
+async def db_schema() -> None:
+    """Create the schema once for the whole test session"""
     async with test_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-    
-    async with TestSessionLocal() as session:
-        yield session
-    
-    async with test_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
 
 
 @pytest.fixture(scope="function")
-async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
-    """Create a test client with database override"""
+async def db_session(db_schema) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Create a test database session inside a transaction that is rolled back
+    after the test. Commits made by the test only release a SAVEPOINT.
+    """
+    async with test_engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(
+            bind=conn,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await trans.rollback()
+
+
+@pytest.fixture(scope="session")
+async def http_client() -> AsyncGenerator[AsyncClient, None]:
+    """One in-process ASGI client for the whole test session"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.fixture(scope="function")
+def client(http_client: AsyncClient, db_session: AsyncSession, monkeypatch) -> Generator[AsyncClient, None, None]:
+    """
+    Create a test client with database override. Background tasks that open
+    their own session get one on the test's connection as well.
+    """
     async def override_get_db():
         yield db_session
     
+    monkeypatch.setattr(auth_routes, "AsyncSessionLocal", async_sessionmaker(
+        bind=db_session.bind,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    ))
     app.dependency_overrides[get_db] = override_get_db
-    
-    async with AsyncClient(app=app, base_url="http://test") as ac:
-        yield ac
-    
-    app.dependency_overrides.clear()
-
-
-@pytest.fixture
-async def test_user(db_session: AsyncSession) -> User:
-    """Create a test user"""
-    user = User(
-        email="test@example.com",
-        password=get_password_hash("testpassword123"),
-        role="customer"
-    )
-    db_session.add(user)
-    await db_session.commit()
-    await db_session.refresh(user)
+    yield http_client
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture(scope="session")
+async def test_user(db_schema) -> User:
+    """
+    Create the test user once for the whole session. It is committed outside
+    the per-test transactions, so changes tests make to it are rolled back.
+    """
+    async with AsyncSession(test_engine, expire_on_commit=False) as session:
+        user = User(
+            email="test@example.com",
+            password=get_password_hash("testpassword123"),
+            role="customer"
+        )
+        session.add(user)
+        await session.commit()
+        await session.refresh(user)
     return user
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def auth_token(test_user: User) -> str:
     """Create an auth token for the test user"""
     return create_access_token(data={"sub": str(test_user.user_id), "email": test_user.email, "role": test_user.role})
 
 
+@pytest.fixture(scope="session")
+def auth_headers(auth_token: str) -> Headers:
+    """Create authorization headers, normalized once for the whole session"""
+    return Headers({"Authorization": f"Bearer {auth_token}"})
+
+
+@pytest.fixture(scope="session")
+def mock_data_dir(tmp_path_factory):
+    """Create a temporary directory for mock data, shared by the route tests"""
+    return tmp_path_factory.mktemp("mocks_salesforce")
+
+
+@pytest.fixture(scope="session")
+def mock_salesforce_service(mock_data_dir) -> Generator[SalesforceService, None, None]:
+    """Override the SalesforceService dependency with one instance using the temp directory"""
+    service = SalesforceService(mock_data_dir=str(mock_data_dir))
+    app.dependency_overrides[get_salesforce_service] = lambda: service
+    yield service
+    app.dependency_overrides.pop(get_salesforce_service, None)
+
+
 @pytest.fixture
-def auth_headers(auth_token: str) -> dict:
-    """Create authorization headers"""
-    return {"Authorization": f"Bearer {auth_token}"}
+def reset_mock_data(mock_data_dir, mock_salesforce_service):
+    """
+    Start a test with an empty mock directory and cold service caches.
+    
+    Route test modules opt in with pytestmark = pytest.mark.usefixtures("reset_mock_data").
+    """
+    for entry in mock_data_dir.iterdir():
+        if entry.is_dir():
+            shutil.rmtree(entry)
+        else:
+            entry.unlink()
+    mock_salesforce_service.clear_cache()
@@ -5,8 +5,12 @@ import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core import security
+from app.core.security import decode_access_token, hash_reset_token
+from app.models.user import User
 
-@pytest.mark.asyncio
+
+@pytest.mark.slow
 async def test_register_new_user(client: AsyncClient):
     """Test registering a new user"""
     response = await client.post(
@@ -26,7 +30,6 @@ async def test_register_new_user(client: AsyncClient):
     assert data["user"]["role"] == "customer"
 
 
-@pytest.mark.asyncio
 async def test_register_duplicate_email(client: AsyncClient, test_user):
     """Test registering with duplicate email"""
     response = await client.post(
@@ -42,7 +45,7 @@ async def test_register_duplicate_email(client: AsyncClient, test_user):
     assert "already registered" in response.json()["detail"].lower()
 
 
-@pytest.mark.asyncio
+@pytest.mark.slow
 async def test_login_success(client: AsyncClient, test_user):
     """Test successful login"""
     response = await client.post(
@@ -60,7 +63,7 @@ async def test_login_success(client: AsyncClient, test_user):
     assert data["user"]["email"] == test_user.email
 
 
-@pytest.mark.asyncio
+@pytest.mark.slow
 async def test_login_invalid_credentials(client: AsyncClient, test_user):
     """Test login with invalid credentials"""
     response = await client.post(
@@ -75,7 +78,7 @@ async def test_login_invalid_credentials(client: AsyncClient, test_user):
     assert "incorrect" in response.json()["detail"].lower()
 
 
-@pytest.mark.asyncio
+@pytest.mark.slow
 async def test_login_nonexistent_user(client: AsyncClient):
     """Test login with non-existent user"""
     response = await client.post(
@@ -89,7 +92,6 @@ async def test_login_nonexistent_user(client: AsyncClient):
     assert response.status_code == 401
 
 
-@pytest.mark.asyncio
 async def test_get_current_user(client: AsyncClient, auth_headers):
     """Test getting current user info"""
     response = await client.get("/auth/me", headers=auth_headers)
@@ -101,16 +103,14 @@ async def test_get_current_user(client: AsyncClient, auth_headers):
     assert "role" in data
 
 
-@pytest.mark.asyncio
 async def test_get_current_user_unauthorized(client: AsyncClient):
     """Test getting current user without auth"""
     response = await client.get("/auth/me")
     
-    assert response.status_code == 403
+    assert response.status_code == 401
 
 
-@pytest.mark.asyncio
-async def test_forgot_password(client: AsyncClient, test_user):
+async def test_forgot_password(client: AsyncClient, test_user, db_session: AsyncSession):
     """Test forgot password endpoint"""
     response = await client.post(
         "/auth/forgot-password",
@@ -122,9 +122,47 @@ async def test_forgot_password(client: AsyncClient, test_user):
     assert "message" in data
     # In test environment, reset token is returned
     assert "reset_token" in data
+    
+    # Token is persisted by the background task
+    user = await db_session.get(User, test_user.user_id)
+    assert user.reset_password_token_hash == hash_reset_token(data["reset_token"])
+
+
+@pytest.mark.slow
+async def test_reset_password(client: AsyncClient, test_user, auth_token):
+    """Test resetting the password with a reset token"""
+    decode_access_token(auth_token)
+    response = await client.post(
+        "/auth/forgot-password",
+        json={"email": test_user.email}
+    )
+    reset_token = response.json()["reset_token"]
+    
+    response = await client.post(
+        "/auth/reset-password",
+        json={"token": reset_token, "new_password": "newpassword123"}
+    )
+    assert response.status_code == 200
+    # Tokens verified before the reset must be verified again
+    assert auth_token not in security._token_cache
+    
+    response = await client.post(
+        "/auth/login",
+        json={"email": test_user.email, "password": "newpassword123"}
+    )
+    assert response.status_code == 200
+
+
+async def test_reset_password_invalid_token(client: AsyncClient, test_user):
+    """Test resetting the password with an unknown token"""
+    response = await client.post(
+        "/auth/reset-password",
+        json={"token": "invalid-token", "new_password": "newpassword123"}
+    )
+    
+    assert response.status_code == 400
 
 
-@pytest.mark.asyncio
 async def test_forgot_password_nonexistent_email(client: AsyncClient):
     """Test forgot password with non-existent email"""
     response = await client.post(
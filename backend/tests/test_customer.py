@@ -0,0 +1,49 @@
+"""
+Tests for customer routes
+"""
+import pytest
+from httpx import AsyncClient
+import orjson
+
+
+# Customer ID that never belongs to the test user
+OTHER_USER_ID = "00000000-0000-0000-0000-000000000000"
+
+
+pytestmark = pytest.mark.usefixtures("reset_mock_data")
+
+
+async def test_get_bundle_success(client: AsyncClient, auth_headers, test_user, mock_data_dir):
+    """Test getting documents and cases together"""
+    case = {
+        "case_id": "5001234567890123",
+        "customer_id": str(test_user.user_id),
+        "subject": "Test Case 1",
+        "description": "Test description",
+        "type": "Support",
+        "status": "New",
+        "created_date": "2024-01-01T10:00:00"
+    }
+    (mock_data_dir / f"cases-{test_user.user_id}.ndjson").write_bytes(orjson.dumps(case) + b"\n")
+    
+    response = await client.get(
+        f"/customer/{test_user.user_id}/bundle",
+        headers=auth_headers
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["documents"] == []
+    assert len(data["cases"]) == 1
+    assert data["cases"][0]["subject"] == "Test Case 1"
+
+
+async def test_get_bundle_wrong_user(client: AsyncClient, auth_headers, test_user):
+    """Test getting the bundle for a different user (should fail)"""
+    response = await client.get(
+        f"/customer/{OTHER_USER_ID}/bundle",
+        headers=auth_headers
+    )
+    
+    assert response.status_code == 403
+    assert "only access your own" in response.json()["detail"].lower()
@@ -4,48 +4,38 @@ Tests for documents routes
 import pytest
 from httpx import AsyncClient
 from pathlib import Path
-import json
+import orjson
 
 
-@pytest.fixture
-def mock_data_dir(tmp_path):
-    """Create a temporary directory for mock data"""
-    mock_dir = tmp_path / "mocks" / "salesforce"
-    mock_dir.mkdir(parents=True, exist_ok=True)
-    return mock_dir
+# Mock store contents, serialized once; fixtures fill in the customer ID
+DOCUMENTS_NDJSON = orjson.dumps({
+    "document_id": "0691234567890123",
+    "customer_id": "__CUSTOMER_ID__",
+    "name": "test-document.pdf",
+    "type": "PDF",
+    "download_url": "/customer/documents/0691234567890123/download",
+    "created_date": "2024-01-01T10:00:00"
+}) + b"\n"
+
+# Smallest payload that still starts like a real PDF
+TEST_PDF = b"%PDF-1.4\n"
+TEST_PDF_UPLOAD = {"file": ("test.pdf", TEST_PDF, "application/pdf")}
+
+# Customer ID that never belongs to the test user
+OTHER_USER_ID = "00000000-0000-0000-0000-000000000000"
 
 
-@pytest.fixture(autouse=True)
-def patch_salesforce_service(mock_data_dir, monkeypatch):
-    """Automatically patch SalesforceService and DOCUMENTS_DIR to use temp directory"""
-    from app.services.salesforce_service import SalesforceService
-    service = SalesforceService(mock_data_dir=str(mock_data_dir))
-    monkeypatch.setattr('app.routes.documents.salesforce_service', service)
-    monkeypatch.setattr('app.routes.documents.DOCUMENTS_DIR', mock_data_dir)
+pytestmark = pytest.mark.usefixtures("reset_mock_data")
 
 
 @pytest.fixture
 def mock_documents_file(mock_data_dir, test_user):
     """Create a mock documents file"""
-    documents_file = mock_data_dir / f"documents-{test_user.user_id}.json"
-    documents_data = {
-        "documents": [
-            {
-                "document_id": "0691234567890123",
-                "customer_id": str(test_user.user_id),
-                "name": "test-document.pdf",
-                "type": "PDF",
-                "download_url": f"/customer/documents/0691234567890123/download",
-                "created_date": "2024-01-01T10:00:00"
-            }
-        ]
-    }
-    with open(documents_file, 'w') as f:
-        json.dump(documents_data, f)
+    documents_file = mock_data_dir / f"documents-{test_user.user_id}.ndjson"
+    documents_file.write_bytes(DOCUMENTS_NDJSON.replace(b"__CUSTOMER_ID__", str(test_user.user_id).encode()))
     return documents_file
 
 
-@pytest.mark.asyncio
 async def test_get_documents_success(client: AsyncClient, auth_headers, test_user, mock_documents_file):
     """Test getting documents for authenticated user"""
     response = await client.get(
@@ -56,11 +46,22 @@ async def test_get_documents_success(client: AsyncClient, auth_headers, test_use
     assert response.status_code == 200
     data = response.json()
     assert "documents" in data
-    assert len(data["documents"]) > 0
     assert data["documents"][0]["name"] == "test-document.pdf"
 
 
-@pytest.mark.asyncio
+async def test_get_documents_streamed(client: AsyncClient, auth_headers, test_user, mock_documents_file, monkeypatch):
+    """Test that a streamed document list matches the regular response"""
+    url = f"/customer/{test_user.user_id}/documents"
+    expected = (await client.get(url, headers=auth_headers)).json()
+    
+    monkeypatch.setattr('app.routes.documents.STREAM_THRESHOLD', 0)
+    response = await client.get(url, headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == expected
+
+
 async def test_get_documents_empty(client: AsyncClient, auth_headers, test_user, mock_data_dir):
     """Test getting documents when none exist"""
     response = await client.get(
@@ -70,73 +71,118 @@ async def test_get_documents_empty(client: AsyncClient, auth_headers, test_user,
     
     assert response.status_code == 200
     data = response.json()
-    assert "documents" in data
-    assert len(data["documents"]) == 0
-
-
-@pytest.mark.asyncio
-async def test_get_documents_unauthorized(client: AsyncClient, test_user):
-    """Test getting documents without authentication"""
-    response = await client.get(f"/customer/{test_user.user_id}/documents")
+    assert data["documents"] == []
+
+
+@pytest.mark.parametrize("authenticated,own_documents,expected_status,expected_detail", [
+    pytest.param(False, True, 401, None, id="unauthorized"),
+    pytest.param(True, False, 403, "only access your own", id="wrong_user"),
+])
+async def test_get_documents_rejected(
+    client: AsyncClient, auth_headers, test_user, authenticated, own_documents, expected_status, expected_detail
+):
+    """Test that reading documents without authentication or for another user fails"""
+    customer_id = test_user.user_id if own_documents else OTHER_USER_ID
     
-    assert response.status_code == 403
-
-
-@pytest.mark.asyncio
-async def test_get_documents_wrong_user(client: AsyncClient, auth_headers, test_user):
-    """Test getting documents for different user (should fail)"""
     response = await client.get(
-        "/customer/00000000-0000-0000-0000-000000000000/documents",
-        headers=auth_headers
+        f"/customer/{customer_id}/documents",
+        headers=auth_headers if authenticated else {}
     )
     
-    assert response.status_code == 403
-    assert "only access your own" in response.json()["detail"].lower()
+    assert response.status_code == expected_status
+    if expected_detail:
+        assert expected_detail in response.json()["detail"].lower()
 
 
-@pytest.mark.asyncio
 async def test_upload_document_success(client: AsyncClient, auth_headers, test_user, mock_data_dir):
     """Test uploading a document"""
-    # Create a test file
-    test_file_content = b"Test PDF content"
-    
     response = await client.post(
         f"/customer/{test_user.user_id}/documents",
         headers=auth_headers,
-        files={"file": ("test.pdf", test_file_content, "application/pdf")},
+        files=TEST_PDF_UPLOAD,
         data={"document_type": "PDF"}
     )
     
     assert response.status_code == 201
     data = response.json()
     assert "document_id" in data
-    assert "name" in data
     assert data["name"] == "test.pdf"
 
 
-@pytest.mark.asyncio
-async def test_upload_document_empty_file(client: AsyncClient, auth_headers, test_user):
-    """Test uploading an empty file"""
+@pytest.mark.parametrize("content,own_documents,expected_status,expected_detail", [
+    pytest.param(b"", True, 400, "empty", id="empty_file"),
+    pytest.param(
+        TEST_PDF, False, 403, "only upload documents to your own account", id="wrong_user"
+    ),
+])
+async def test_upload_document_rejected(
+    client: AsyncClient, auth_headers, test_user, content, own_documents, expected_status, expected_detail
+):
+    """Test that empty uploads and uploads for another user are rejected"""
+    customer_id = test_user.user_id if own_documents else OTHER_USER_ID
+    
     response = await client.post(
-        f"/customer/{test_user.user_id}/documents",
+        f"/customer/{customer_id}/documents",
         headers=auth_headers,
-        files={"file": ("empty.pdf", b"", "application/pdf")}
+        files={"file": ("test.pdf", content, "application/pdf")}
     )
     
-    assert response.status_code == 400
-    assert "empty" in response.json()["detail"].lower()
+    assert response.status_code == expected_status
+    assert expected_detail in response.json()["detail"].lower()
 
 
-@pytest.mark.asyncio
-async def test_upload_document_wrong_user(client: AsyncClient, auth_headers, test_user):
-    """Test uploading document for different user (should fail)"""
-    test_file_content = b"Test PDF content"
+async def test_download_document_success(client: AsyncClient, auth_headers, mock_documents_file, mock_data_dir):
+    """Test downloading a document"""
+    (mock_data_dir / "0691234567890123.pdf").write_bytes(TEST_PDF)
     
-    response = await client.post(
-        "/customer/00000000-0000-0000-0000-000000000000/documents",
-        headers=auth_headers,
-        files={"file": ("test.pdf", test_file_content, "application/pdf")}
+    response = await client.get(
+        "/customer/documents/0691234567890123/download",
+        headers=auth_headers
+    )
+    
+    assert response.status_code == 200
+    assert response.content == TEST_PDF
+    assert response.headers["content-type"] == "application/pdf"
+    assert "test-document.pdf" in response.headers["content-disposition"]
+
+
+async def test_download_document_not_found(client: AsyncClient, auth_headers, mock_documents_file):
+    """Test downloading a document that does not exist"""
+    response = await client.get(
+        "/customer/documents/069unknown/download",
+        headers=auth_headers
+    )
+    
+    assert response.status_code == 404
+
+
+async def test_download_document_missing_pdf(client: AsyncClient, auth_headers, mock_documents_file):
+    """Test downloading a document whose PDF file is missing"""
+    response = await client.get(
+        "/customer/documents/0691234567890123/download",
+        headers=auth_headers
+    )
+    
+    assert response.status_code == 404
+    assert "pdf file not found" in response.json()["detail"].lower()
+
+
+async def test_download_document_wrong_user(client: AsyncClient, auth_headers, mock_data_dir):
+    """Test that another customer's document looks the same as a missing one"""
+    documents_file = mock_data_dir / "documents-999.json"
+    documents_file.write_bytes(orjson.dumps({"documents": [{
+        "document_id": "0699999999999999",
+        "customer_id": "999",
+        "name": "other.pdf",
+        "type": "PDF",
+        "download_url": "/customer/documents/0699999999999999/download",
+        "created_date": "2024-01-01T10:00:00"
+    }]}))
+    
+    response = await client.get(
+        "/customer/documents/0699999999999999/download",
+        headers=auth_headers
     )
     
-    assert response.status_code == 403
-    assert "only upload documents to your own account" in response.json()["detail"].lower()
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Document not found"
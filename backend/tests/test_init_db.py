@@ -0,0 +1,62 @@
+"""
+Tests for the schema upgrade in init_db.py
+"""
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.database import Base
+from app.models.user import User
+from init_db import upgrade_schema
+
+
+# users as created by init_db.py before reset tokens were hashed
+LEGACY_USERS_DDL = [
+    """
+    CREATE TABLE users (
+        user_id CHAR(32) NOT NULL PRIMARY KEY,
+        email VARCHAR(255) NOT NULL,
+        password VARCHAR(255) NOT NULL,
+        role VARCHAR(50) NOT NULL,
+        token TEXT,
+        reset_password_token VARCHAR(255),
+        reset_password_expires DATETIME,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )
+    """,
+    "CREATE UNIQUE INDEX ix_users_email ON users (email)",
+    "CREATE INDEX ix_users_reset_password_token_expires ON users (reset_password_token, reset_password_expires)",
+]
+
+
+@pytest.fixture
+async def legacy_engine(tmp_path):
+    """A file database whose users table predates the current model"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'legacy.db'}")
+    async with engine.begin() as conn:
+        for statement in LEGACY_USERS_DDL:
+            await conn.execute(text(statement))
+    yield engine
+    await engine.dispose()
+
+
+async def test_upgrade_schema_legacy_users_table(legacy_engine):
+    """Test that an existing users table is upgraded in place, and that rerunning is a no-op"""
+    for _ in range(2):
+        async with legacy_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(upgrade_schema)
+
+    async with legacy_engine.connect() as conn:
+        columns, indexes = await conn.run_sync(lambda sync_conn: (
+            {column["name"] for column in inspect(sync_conn).get_columns("users")},
+            {index["name"] for index in inspect(sync_conn).get_indexes("users")},
+        ))
+    assert columns == set(User.__table__.columns.keys())
+    assert "ix_users_reset_password_token_hash_expires" in indexes
+    assert "ix_users_reset_password_token_expires" not in indexes
+
+    async with AsyncSession(legacy_engine) as session:
+        session.add(User(email="legacy@example.com", password="x" * 60, role="customer"))
+        await session.commit()
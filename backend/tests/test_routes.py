@@ -0,0 +1,21 @@
+"""
+Tests for application route registration
+"""
+from collections import Counter
+
+from fastapi.routing import APIRoute
+
+from app.main import app
+
+
+def test_no_duplicate_routes():
+    """Test that no method/path pair is registered twice"""
+    registrations = Counter(
+        (method, route.path)
+        for route in app.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    )
+    
+    duplicates = [key for key, count in registrations.items() if count > 1]
+    assert duplicates == []
@@ -1,13 +1,18 @@
 """
 Tests for SalesforceService
 """
+import asyncio
+import io
+import os
 import pytest
 from pathlib import Path
-import json
 import tempfile
 import shutil
 from datetime import datetime
 
+import orjson
+
+from app.services import salesforce_service as salesforce_service_module
 from app.services.salesforce_service import SalesforceService
 from app.models.case import CaseCreateRequest
 
@@ -26,15 +31,15 @@ def salesforce_service(temp_mock_dir):
     return SalesforceService(mock_data_dir=str(temp_mock_dir))
 
 
-def test_get_customer_documents_empty(salesforce_service, temp_mock_dir):
+async def test_get_customer_documents_empty(salesforce_service, temp_mock_dir):
     """Test getting documents when none exist"""
     customer_id = "123"
-    documents = salesforce_service.get_customer_documents(customer_id)
+    documents = await salesforce_service.get_customer_documents(customer_id)
     
     assert documents == []
 
 
-def test_get_customer_documents_success(salesforce_service, temp_mock_dir):
+async def test_get_customer_documents_success(salesforce_service, temp_mock_dir):
     """Test getting documents successfully"""
     customer_id = "123"
     mock_file = temp_mock_dir / f"documents-{customer_id}.json"
@@ -52,10 +57,9 @@ def test_get_customer_documents_success(salesforce_service, temp_mock_dir):
         ]
     }
     
-    with open(mock_file, 'w') as f:
-        json.dump(documents_data, f)
+    mock_file.write_bytes(orjson.dumps(documents_data))
     
-    documents = salesforce_service.get_customer_documents(customer_id)
+    documents = await salesforce_service.get_customer_documents(customer_id)
     
     assert len(documents) == 1
     assert documents[0].document_id == "0691234567890123"
@@ -63,15 +67,124 @@ def test_get_customer_documents_success(salesforce_service, temp_mock_dir):
     assert documents[0].type == "PDF"
 
 
-def test_get_customer_cases_empty(salesforce_service, temp_mock_dir):
+async def test_lookup_document(salesforce_service, temp_mock_dir):
+    """Test looking up a document's owner across customers"""
+    mock_file = temp_mock_dir / "documents-123.json"
+    
+    mock_file.write_bytes(orjson.dumps({"documents": [{
+        "document_id": "0691234567890123",
+        "customer_id": "123",
+        "name": "test.pdf",
+        "type": "PDF",
+        "download_url": "/customer/documents/0691234567890123/download",
+        "created_date": "2024-01-01T10:00:00"
+    }]}))
+    
+    meta = await salesforce_service.lookup_document("0691234567890123")
+    
+    assert meta.customer_id == "123"
+    assert meta.name == "test.pdf"
+    assert await salesforce_service.lookup_document("069unknown") is None
+    
+    uploaded = await salesforce_service.upload_document(
+        customer_id="456",
+        file_stream=io.BytesIO(b"Test PDF content"),
+        filename="uploaded.pdf"
+    )
+    
+    assert await salesforce_service.lookup_document(uploaded.document_id) == ("456", "uploaded.pdf")
+    assert (await salesforce_service.get_pdf_path(uploaded.document_id)).read_bytes() == b"Test PDF content"
+    assert await salesforce_service.get_pdf_path("0691234567890123") is None
+
+
+async def test_lookup_document_appended_to_existing_store(salesforce_service, temp_mock_dir, monkeypatch):
+    """Test a document appended to an existing store is found without a directory change"""
+    monkeypatch.setattr(salesforce_service_module, "INDEX_MISS_RECHECK_SECONDS", 0)
+    mock_file = temp_mock_dir / "documents-123.ndjson"
+    record = {
+        "document_id": "0691234567890123",
+        "customer_id": "123",
+        "name": "test.pdf",
+        "type": "PDF",
+        "download_url": "/customer/documents/0691234567890123/download",
+        "created_date": "2024-01-01T10:00:00"
+    }
+    mock_file.write_bytes(orjson.dumps(record) + b"\n")
+    assert await salesforce_service.lookup_document("0691234567890124") is None
+    
+    dir_mtime_ns = temp_mock_dir.stat().st_mtime_ns
+    with open(mock_file, "ab") as f:
+        f.write(orjson.dumps({**record, "document_id": "0691234567890124", "name": "new.pdf"}) + b"\n")
+    # Make sure the store's mtime moves even on coarse-grained filesystems
+    os.utime(mock_file, ns=(mock_file.stat().st_atime_ns, mock_file.stat().st_mtime_ns + 1_000_000_000))
+    assert temp_mock_dir.stat().st_mtime_ns == dir_mtime_ns
+    
+    meta = await salesforce_service.lookup_document("0691234567890124")
+    
+    assert meta == ("123", "new.pdf")
+
+
+async def test_lookup_document_uploaded_by_other_instance(temp_mock_dir, monkeypatch):
+    """Test that an instance's own uploads don't hide another instance's uploads from it"""
+    monkeypatch.setattr(salesforce_service_module, "INDEX_MISS_RECHECK_SECONDS", 0)
+    first = SalesforceService(mock_data_dir=str(temp_mock_dir))
+    second = SalesforceService(mock_data_dir=str(temp_mock_dir))
+    # Both have built their indexes before either uploads
+    assert await first.lookup_document("069unknown") is None
+    assert await second.lookup_document("069unknown") is None
+    
+    uploaded = await first.upload_document(
+        customer_id="123",
+        file_stream=io.BytesIO(b"First PDF content"),
+        filename="first.pdf"
+    )
+    await second.upload_document(
+        customer_id="456",
+        file_stream=io.BytesIO(b"Second PDF content"),
+        filename="second.pdf"
+    )
+    
+    assert await second.lookup_document(uploaded.document_id) == ("123", "first.pdf")
+    assert (await second.get_pdf_path(uploaded.document_id)).read_bytes() == b"First PDF content"
+
+
+async def test_lookup_document_checks_dir_once_per_ttl(salesforce_service, temp_mock_dir, monkeypatch):
+    """Test that index hits within the TTL don't touch the disk, and misses are rate-limited"""
+    monkeypatch.setattr(salesforce_service_module, "INDEX_MISS_RECHECK_SECONDS", 0)
+    (temp_mock_dir / "documents-123.ndjson").write_bytes(orjson.dumps({
+        "document_id": "0691234567890123",
+        "customer_id": "123",
+        "name": "test.pdf",
+        "type": "PDF",
+        "download_url": "/customer/documents/0691234567890123/download",
+        "created_date": "2024-01-01T10:00:00"
+    }) + b"\n")
+    assert await salesforce_service.lookup_document("0691234567890123") is not None
+    
+    refreshes = []
+    refresh_dir_index = salesforce_service._refresh_dir_index
+    monkeypatch.setattr(salesforce_service, "_refresh_dir_index", lambda: refreshes.append(1) or refresh_dir_index())
+    
+    assert await salesforce_service.lookup_document("0691234567890123") is not None
+    assert refreshes == []
+    
+    assert await salesforce_service.lookup_document("069unknown") is None
+    assert refreshes == [1]
+    
+    monkeypatch.setattr(salesforce_service_module, "INDEX_MISS_RECHECK_SECONDS", 60)
+    await asyncio.gather(*(salesforce_service.lookup_document("069unknown") for _ in range(10)))
+    assert refreshes == [1]
+
+
+async def test_get_customer_cases_empty(salesforce_service, temp_mock_dir):
     """Test getting cases when none exist"""
     customer_id = "123"
-    cases = salesforce_service.get_customer_cases(customer_id)
+    cases = await salesforce_service.get_customer_cases(customer_id)
     
     assert cases == []
 
 
-def test_get_customer_cases_success(salesforce_service, temp_mock_dir):
+async def test_get_customer_cases_success(salesforce_service, temp_mock_dir):
     """Test getting cases successfully"""
     customer_id = "123"
     mock_file = temp_mock_dir / f"cases-{customer_id}.json"
@@ -90,10 +203,9 @@ def test_get_customer_cases_success(salesforce_service, temp_mock_dir):
         ]
     }
     
-    with open(mock_file, 'w') as f:
-        json.dump(cases_data, f)
+    mock_file.write_bytes(orjson.dumps(cases_data))
     
-    cases = salesforce_service.get_customer_cases(customer_id)
+    cases = await salesforce_service.get_customer_cases(customer_id)
     
     assert len(cases) == 1
     assert cases[0].case_id == "5001234567890123"
@@ -101,7 +213,25 @@ def test_get_customer_cases_success(salesforce_service, temp_mock_dir):
     assert cases[0].status == "New"
 
 
-def test_create_case_success(salesforce_service, temp_mock_dir):
+async def test_get_customer_bundle(salesforce_service, temp_mock_dir):
+    """Test getting documents and cases in one call"""
+    customer_id = "123"
+    (temp_mock_dir / f"documents-{customer_id}.ndjson").write_bytes(orjson.dumps({
+        "document_id": "0691234567890123",
+        "customer_id": customer_id,
+        "name": "Test Document.pdf",
+        "type": "Invoice",
+        "download_url": "/documents/0691234567890123/download",
+        "created_date": "2024-01-01T10:00:00"
+    }) + b"\n")
+    
+    documents, cases = await salesforce_service.get_customer_bundle(customer_id)
+    
+    assert [doc.document_id for doc in documents] == ["0691234567890123"]
+    assert cases == []
+
+
+async def test_create_case_success(salesforce_service, temp_mock_dir):
     """Test creating a case successfully"""
     customer_id = "123"
     case_request = CaseCreateRequest(
@@ -109,7 +239,7 @@ def test_create_case_success(salesforce_service, temp_mock_dir):
         description="Test description"
     )
     
-    created_case = salesforce_service.create_case(customer_id, case_request)
+    created_case = await salesforce_service.create_case(customer_id, case_request)
     
     assert created_case.case_id is not None
     assert created_case.subject == "New Test Case"
@@ -120,29 +250,142 @@ def test_create_case_success(salesforce_service, temp_mock_dir):
     new_case_file = temp_mock_dir / "new-case.json"
     assert new_case_file.exists()
     
-    incoming_file = temp_mock_dir / f"incoming-cases-{customer_id}.json"
-    assert incoming_file.exists()
+    incoming_file = temp_mock_dir / f"incoming-cases-{customer_id}.ndjson"
+    incoming = [orjson.loads(line) for line in incoming_file.read_bytes().splitlines()]
+    assert len(incoming) == 1
+    assert incoming[0]["status"] == "eingehend"
+    assert incoming[0]["salesforce_mapped"]["Status"] == "New"
+    
+    # Verify case was appended to cases file
+    cases_file = temp_mock_dir / f"cases-{customer_id}.ndjson"
+    cases = [orjson.loads(line) for line in cases_file.read_bytes().splitlines()]
+    assert len(cases) == 1
+    assert cases[0]["subject"] == "New Test Case"
+
+
+async def test_create_case_invalidates_cached_cases(salesforce_service, temp_mock_dir):
+    """Test that a cached case list is refreshed after creating a case"""
+    customer_id = "123"
+    mock_file = temp_mock_dir / f"cases-{customer_id}.json"
+    
+    mock_file.write_bytes(orjson.dumps({"cases": []}))
+    
+    assert await salesforce_service.get_customer_cases(customer_id) == []
+    
+    await salesforce_service.create_case(customer_id, CaseCreateRequest(subject="Cached Case"))
+    
+    cases = await salesforce_service.get_customer_cases(customer_id)
+    assert len(cases) == 1
+    assert cases[0].subject == "Cached Case"
+
+
+async def test_read_racing_write_not_cached(salesforce_service, temp_mock_dir):
+    """Test that a read overlapping a write doesn't cache what it loaded before the write"""
+    customer_id = "123"
+    (temp_mock_dir / f"cases-{customer_id}.ndjson").write_bytes(b"")
+    
+    def load_then_write(mock_file):
+        cases = salesforce_service._load_cases(mock_file)
+        salesforce_service._create_case(customer_id, CaseCreateRequest(subject="Raced Case"))
+        return cases
+    
+    assert salesforce_service._refresh_cached("cases", customer_id, load_then_write) == []
+    
+    cases = await salesforce_service.get_customer_cases(customer_id)
+    assert [case.subject for case in cases] == ["Raced Case"]
+
+
+async def test_legacy_json_file_read_only(salesforce_service, temp_mock_dir):
+    """Test that reading a legacy {"cases": [...]} file never writes to the mock directory"""
+    customer_id = "123"
+    legacy_file = temp_mock_dir / f"cases-{customer_id}.json"
+    legacy_file.write_bytes(orjson.dumps({"cases": [{
+        "case_id": "5001234567890123",
+        "customer_id": customer_id,
+        "subject": "Legacy Case",
+        "status": "New",
+        "created_date": "2024-01-01T10:00:00"
+    }]}))
+    
+    cases = await salesforce_service.get_customer_cases(customer_id)
+    
+    assert [case.subject for case in cases] == ["Legacy Case"]
+    assert [path.name for path in temp_mock_dir.iterdir()] == [legacy_file.name]
+
+
+async def test_legacy_json_file_migrated(salesforce_service, temp_mock_dir):
+    """Test that a legacy {"cases": [...]} file is converted to NDJSON on the next write"""
+    customer_id = "123"
+    legacy_file = temp_mock_dir / f"cases-{customer_id}.json"
+    
+    legacy_file.write_bytes(orjson.dumps({"cases": [{
+        "case_id": "5001234567890123",
+        "customer_id": customer_id,
+        "subject": "Legacy Case",
+        "status": "New",
+        "created_date": "2024-01-01T10:00:00"
+    }]}))
     
-    cases_file = temp_mock_dir / f"cases-{customer_id}.json"
-    assert cases_file.exists()
+    await salesforce_service.create_case(customer_id, CaseCreateRequest(subject="New Case"))
     
-    # Verify case was added to cases file
-    with open(cases_file, 'r') as f:
-        data = json.load(f)
-        assert len(data["cases"]) == 1
-        assert data["cases"][0]["subject"] == "New Test Case"
+    assert not legacy_file.exists()
+    cases = await salesforce_service.get_customer_cases(customer_id)
+    assert [case.subject for case in cases] == ["Legacy Case", "New Case"]
 
 
-def test_upload_document_success(salesforce_service, temp_mock_dir):
+async def test_create_case_concurrent(salesforce_service, temp_mock_dir):
+    """Test that concurrent case creation keeps every case"""
+    customer_id = "123"
+    
+    await asyncio.gather(*(
+        salesforce_service.create_case(customer_id, CaseCreateRequest(subject=f"Case {i}"))
+        for i in range(10)
+    ))
+    
+    cases_file = temp_mock_dir / f"cases-{customer_id}.ndjson"
+    cases = [orjson.loads(line) for line in cases_file.read_bytes().splitlines()]
+    assert sorted(case["subject"] for case in cases) == sorted(f"Case {i}" for i in range(10))
+
+
+async def test_cached_cases_reloaded_when_file_changes(salesforce_service, temp_mock_dir, monkeypatch):
+    """Test that an expired cache entry is only re-parsed if the file's mtime changed"""
+    monkeypatch.setattr(salesforce_service_module, "CACHE_TTL_SECONDS", 0)
+    customer_id = "123"
+    mock_file = temp_mock_dir / f"cases-{customer_id}.ndjson"
+    
+    mock_file.write_bytes(b"")
+    os.utime(mock_file, ns=(1_000_000_000, 1_000_000_000))
+    
+    assert await salesforce_service.get_customer_cases(customer_id) == []
+    
+    mock_file.write_bytes(orjson.dumps({
+        "case_id": "5001234567890123",
+        "customer_id": customer_id,
+        "subject": "Edited Case",
+        "status": "New",
+        "created_date": "2024-01-01T10:00:00"
+    }) + b"\n")
+    
+    # Same mtime: the cached list is reused without re-parsing
+    os.utime(mock_file, ns=(1_000_000_000, 1_000_000_000))
+    assert await salesforce_service.get_customer_cases(customer_id) == []
+    
+    os.utime(mock_file, ns=(2_000_000_000, 2_000_000_000))
+    cases = await salesforce_service.get_customer_cases(customer_id)
+    assert len(cases) == 1
+    assert cases[0].subject == "Edited Case"
+
+
+async def test_upload_document_success(salesforce_service, temp_mock_dir):
     """Test uploading a document successfully"""
     customer_id = "123"
     file_content = b"Test PDF content"
     filename = "test.pdf"
     document_type = "PDF"
     
-    document = salesforce_service.upload_document(
+    document = await salesforce_service.upload_document(
         customer_id=customer_id,
-        file_content=file_content,
+        file_stream=io.BytesIO(file_content),
         filename=filename,
         document_type=document_type
     )
@@ -153,14 +396,26 @@ def test_upload_document_success(salesforce_service, temp_mock_dir):
     assert document.customer_id == customer_id
     
     # Verify file was saved
-    pdf_file = temp_mock_dir / f"{document.document_id}.pdf"
-    assert pdf_file.exists()
+    pdf_file = temp_mock_dir / "pdfs" / document.document_id[-2:] / f"{document.document_id}.pdf"
+    assert pdf_file.read_bytes() == file_content
     
     # Verify document was added to documents file
-    documents_file = temp_mock_dir / f"documents-{customer_id}.json"
-    assert documents_file.exists()
+    documents_file = temp_mock_dir / f"documents-{customer_id}.ndjson"
+    documents = [orjson.loads(line) for line in documents_file.read_bytes().splitlines()]
+    assert len(documents) == 1
+    assert documents[0]["name"] == filename
+
+
+async def test_upload_document_too_large(salesforce_service, temp_mock_dir):
+    """Test that oversized uploads are rejected without leaving files behind"""
+    customer_id = "123"
+    
+    with pytest.raises(ValueError, match="exceeds maximum"):
+        await salesforce_service.upload_document(
+            customer_id=customer_id,
+            file_stream=io.BytesIO(b"Test PDF content"),
+            filename="test.pdf",
+            max_size=4
+        )
     
-    with open(documents_file, 'r') as f:
-        data = json.load(f)
-        assert len(data["documents"]) == 1
-        assert data["documents"][0]["name"] == filename
+    assert [path for path in temp_mock_dir.rglob("*") if path.is_file()] == []
@@ -0,0 +1,104 @@
+"""
+Tests for security utilities
+"""
+from datetime import timedelta
+
+import bcrypt
+import pytest
+
+from app.core import security
+from app.core.security import (
+    BCRYPT_ROUNDS,
+    create_access_token,
+    decode_access_token,
+    get_dummy_password_hash,
+    get_password_hash,
+    init_dummy_password_hash,
+    invalidate_access_token,
+    invalidate_user_tokens,
+    verify_password,
+)
+
+
+@pytest.mark.slow
+def test_password_hash_uses_configured_rounds():
+    """Test that hashes embed the configured bcrypt cost"""
+    hashed = get_password_hash("testpassword123")
+
+    assert hashed.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+    assert verify_password("testpassword123", hashed)
+
+
+def test_salt_pool_matches_gensalt_format():
+    """Test that pooled salts are valid bcrypt salts"""
+    pool = security._SaltPool(batch_size=2)
+    salts = [pool.gensalt(4) for _ in range(3)]
+
+    assert len(set(salts)) == 3
+    for salt in salts:
+        assert len(salt) == len(bcrypt.gensalt(rounds=4))
+        assert salt.startswith(b"$2b$04$")
+        hashed = bcrypt.hashpw(b"testpassword123", salt)
+        assert hashed.startswith(salt)
+        assert bcrypt.checkpw(b"testpassword123", hashed)
+
+
+def test_decode_access_token_caches_payload():
+    """Test that a verified token is served from the cache"""
+    token = create_access_token(data={"sub": "123"})
+
+    payload = decode_access_token(token)
+
+    assert payload["sub"] == "123"
+    assert token in security._token_cache
+    assert decode_access_token(token) is payload
+
+
+def test_decode_access_token_invalid_not_cached():
+    """Test that invalid tokens are rejected and never cached"""
+    assert decode_access_token("not-a-jwt") is None
+    assert "not-a-jwt" not in security._token_cache
+
+
+def test_decode_access_token_expired():
+    """Test that expired tokens are rejected"""
+    token = create_access_token(data={"sub": "123"}, expires_delta=timedelta(seconds=-1))
+
+    assert decode_access_token(token) is None
+    assert token not in security._token_cache
+
+
+def test_invalidate_access_token():
+    """Test evicting a token from the cache"""
+    token = create_access_token(data={"sub": "123"})
+    decode_access_token(token)
+
+    invalidate_access_token(token)
+
+    assert token not in security._token_cache
+
+
+def test_invalidate_user_tokens():
+    """Test evicting all cached tokens of one user"""
+    tokens = [create_access_token(data={"sub": "123", "n": n}) for n in range(2)]
+    other_token = create_access_token(data={"sub": "456"})
+    for token in (*tokens, other_token):
+        decode_access_token(token)
+
+    invalidate_user_tokens(123)
+
+    assert not any(token in security._token_cache for token in tokens)
+    assert other_token in security._token_cache
+
+
+@pytest.mark.slow
+async def test_dummy_password_hash_precomputed(monkeypatch):
+    """Test that the startup hook computes the dummy hash the login route reads"""
+    monkeypatch.setattr(security, "_dummy_password_hash", None)
+    
+    await init_dummy_password_hash()
+    dummy = security._dummy_password_hash
+    
+    assert dummy.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+    assert await get_dummy_password_hash() is dummy
+    assert not verify_password("testpassword123", dummy)
@@ -46,6 +46,10 @@ ssh $SERVER "cd $REMOTE_DIR && \
   docker pull $REGISTRY/$GITHUB_REPO/backend:latest && \
   docker pull $REGISTRY/$GITHUB_REPO/frontend:latest"
 
+# Create/upgrade the database schema once, before any backend replica starts
+echo "🗄️  Initializing database schema..."
+ssh $SERVER "docker run --rm -e DATABASE_URL $REGISTRY/$GITHUB_REPO/backend:latest python init_db.py"
+
 # Deploy stack
 echo "🚢 Deploying Docker Swarm stack..."
 ssh $SERVER "cd $REMOTE_DIR && docker stack deploy -c docker-compose.prod.yml $STACK_NAME"
@@ -35,6 +35,10 @@ echo "📥 Pulling latest images from registry..."
 docker pull $REGISTRY/$GITHUB_REPO/backend:latest || echo "⚠️  Warning: Could not pull backend image"
 docker pull $REGISTRY/$GITHUB_REPO/frontend:latest || echo "⚠️  Warning: Could not pull frontend image"
 
+# Create/upgrade the database schema once, before any backend replica starts
+echo "🗄️  Initializing database schema..."
+docker run --rm -e DATABASE_URL $REGISTRY/$GITHUB_REPO/backend:latest python init_db.py
+
 # Deploy stack
 echo "🚢 Deploying Docker Swarm stack..."
 docker stack deploy -c docker-compose.prod.yml $STACK_NAME
@@ -14,7 +14,7 @@ if [ ! -d "venv" ]; then
 fi
 source venv/bin/activate
 pip install -r requirements.txt > /dev/null 2>&1
-uvicorn app.main:app --reload --port 8000 &
+AUTO_CREATE_SCHEMA=1 uvicorn app.main:app --reload --port 8000 &
 BACKEND_PID=$!
 
 # Wait a moment for backend to start